@@ -1,67 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import delete
 from app.database import get_db
-from app.models import Article, SavedArticle, User
-from app.utils.auth import get_current_user
-import uuid
-from datetime import datetime
+from app.models import Article, SavedArticle
+from app.utils.auth import get_current_user, CurrentUser
 from app.analytics.posthog_client import track_event
+from app.utils.read_counter import record_read
+from app.helper.article_slugs import article_slugs
+from app.utils.save_counters import save_stmt, unsave_stmt
+from app.helper.pagination import PageParams, keyset, paginate
+from app.helper.saved_articles import get_saved_slugs, get_saved_status, invalidate_saved, is_saved, MAX_STATUS_SLUGS
+from app.utils.leaderboard import leaderboard, MAX_LIMIT as LEADERBOARD_MAX_LIMIT
+from typing import Literal
 
 router = APIRouter()
 
-# ✅ Save article
+# ✅ Save article (one statement: insert bookmark + bump save_count)
 @router.post("/save/{slug}")
 async def save_article(
     slug: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    # get article by slug
-    result = await db.execute(select(Article).where(Article.slug == slug))
-    article = result.scalar_one_or_none()
-    if not article:
+    row = (await db.execute(save_stmt(current_user.id, slug))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Article not found")
-
-    # check if already saved
-    result = await db.execute(
-        select(SavedArticle).where(
-            SavedArticle.user_id == current_user.id,
-            SavedArticle.article_id == article.id,
-        )
-    )
-    existing = result.scalar_one_or_none()
-    if existing:
+    if row.after is None:
         return {"status": "already_saved"}
 
-    saved = SavedArticle(
-        id=uuid.uuid4(),
-        user_id=current_user.id,
-        article_id=article.id,
-        created_at=datetime.utcnow(),
-    )
-    db.add(saved)
-    article.save_count += 1  # ✅ increment global counter
     await db.commit()
+    invalidate_saved(current_user.id)
     track_event(str(current_user.id), "article_saved", {"slug": slug})
 
-    return {"status": "saved", "save_count": article.save_count}
+    return {"status": "saved", "save_count": row.after}
 
 
 # ✅ Get saved articles for current user
 @router.get("/saved")
 async def get_saved_articles(
+    response: Response,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    # join to fetch metadata
+    # join to fetch metadata, newest saves first
     result = await db.execute(
-        select(Article)
-        .join(SavedArticle, SavedArticle.article_id == Article.id)
-        .where(SavedArticle.user_id == current_user.id)
+        keyset(
+            select(Article, SavedArticle.created_at, SavedArticle.id)
+            .join(SavedArticle, SavedArticle.article_id == Article.id)
+            .where(SavedArticle.user_id == current_user.id),
+            SavedArticle.created_at, SavedArticle.id, page,
+        )
     )
-    articles = result.scalars().all()
+    rows = paginate(result.all(), page, response, lambda r: (r.created_at, r.id))
+    articles = [r.Article for r in rows]
 
     return {
         "saved": [
@@ -77,35 +70,49 @@ async def get_saved_articles(
     }
 
 
-# ✅ Unsave article
+# ✅ Unsave article (one statement: delete bookmark + decrement save_count)
 @router.delete("/save/{slug}")
 async def unsave_article(
     slug: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    result = await db.execute(select(Article).where(Article.slug == slug))
-    article = result.scalar_one_or_none()
-    if not article:
+    row = (await db.execute(unsave_stmt(current_user.id, slug))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Article not found")
-
-    # delete the SavedArticle entry
-    q = await db.execute(
-        select(SavedArticle).where(
-            SavedArticle.user_id == current_user.id,
-            SavedArticle.article_id == article.id,
-        )
-    )
-    saved = q.scalar_one_or_none()
-    if not saved:
+    if row.after is None:
         raise HTTPException(status_code=404, detail="Not saved")
 
-    await db.delete(saved)
-    article.save_count = max(0, article.save_count - 1)  # ✅ decrement safely
     await db.commit()
+    invalidate_saved(current_user.id)
     track_event(str(current_user.id), "article_unsaved", {"slug": slug})
 
-    return {"status": "removed", "save_count": article.save_count}
+    return {"status": "removed", "save_count": row.after}
+
+
+# ✅ Saved flags + counters for a list of articles (one query for a whole page of cards)
+@router.get("/saved-status")
+async def get_saved_status_batch(
+    slugs: str = Query(..., description="Comma-separated article slugs"),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    wanted = list(dict.fromkeys(s.strip() for s in slugs.split(",") if s.strip()))
+    if len(wanted) > MAX_STATUS_SLUGS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATUS_SLUGS} slugs per request")
+    if not wanted:
+        return {"articles": {}}
+
+    return {"articles": await get_saved_status(db, current_user.id, wanted)}
+
+
+# ✅ Slugs of every article the current user saved (cached per user)
+@router.get("/saved-slugs")
+async def get_saved_article_slugs(
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    return {"slugs": sorted(await get_saved_slugs(db, current_user.id))}
 
 
 # ✅ Check if current user saved a specific article
@@ -113,54 +120,31 @@ async def unsave_article(
 async def is_article_saved(
     slug: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    result = await db.execute(select(Article).where(Article.slug == slug))
-    article = result.scalar_one_or_none()
-    if not article:
+    # Not served from the saved-slugs cache: a save on another worker must show up at once
+    saved = await is_saved(db, current_user.id, slug)
+    if saved is None:
         raise HTTPException(status_code=404, detail="Article not found")
 
-    q = await db.execute(
-        select(SavedArticle).where(
-            SavedArticle.user_id == current_user.id,
-            SavedArticle.article_id == article.id,
-        )
-    )
-    saved = q.scalar_one_or_none()
-
-    return {"isSaved": bool(saved)}
+    return {"isSaved": saved}
 
-# ✅ Get top read articles
+# ✅ Get top read articles (served from the in-memory leaderboard)
 @router.get("/top")
 async def get_top_articles(
-    limit: int = 3,
+    limit: int = Query(3, ge=1, le=LEADERBOARD_MAX_LIMIT),
+    window: Literal["all", "week", "month"] = "all",
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Article).order_by(Article.read_count.desc()).limit(limit)
-    )
-    articles = result.scalars().all()
-
-    return [
-        {
-            "slug": a.slug,
-            "title": a.title,
-            "excerpt": a.excerpt,
-            "read_count": a.read_count,
-            "save_count": a.save_count,
-        }
-        for a in articles
-    ]
+    return await leaderboard.top(db, limit=limit, window=window)
 
 @router.post("/{slug}/read")
 async def increment_article_read(slug: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Article).where(Article.slug == slug))
-    article = result.scalar_one_or_none()
-    if not article:
+    # Known slugs come from memory; only buffered reads for real articles are counted
+    if await article_slugs.get_id(db, slug) is None:
         raise HTTPException(404, "Article not found")
 
-    article.read_count += 1
-    article.updated_at = datetime.utcnow()
-    await db.commit()
+    # Buffered in memory and flushed in batches (see app/utils/read_counter.py)
+    pending = record_read(slug)
     track_event(None, "article_read", {"slug": slug})
-    return {"slug": slug, "read_count": article.read_count}
+    return {"slug": slug, "status": "queued", "pending_reads": pending}
@@ -5,43 +5,60 @@ from fastapi.responses import JSONResponse
 from app.database import get_db
 from app.models import User, Waitlist, Participant, UserPreferences
 from app.utils.auth import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password,
     create_access_token,
     get_current_user,
+    CurrentUser,
     set_auth_cookies,
     clear_auth_cookies,
+    invalidate_user,
 )
 from pydantic import BaseModel, EmailStr
 import uuid
 import json
 import os
+import logging
 from jose import jwt, JWTError
 
-from firebase_admin import auth as firebase_auth, credentials, initialize_app, exceptions
 from app.analytics.posthog_client import track_event, identify_user
 
-# ---------------- Firebase init ----------------
-firebase_creds_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
-firebase_creds_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
+logger = logging.getLogger(__name__)
 
-if firebase_creds_json:
-    try:
-        json_dict = json.loads(firebase_creds_json)
-        json_dict["private_key"] = json_dict["private_key"].replace("\\n", "\n")
-        cred = credentials.Certificate(json_dict)
-        initialize_app(cred)
-    except Exception as e:
-        raise RuntimeError("Failed to initialize Firebase Admin SDK from JSON string") from e
-
-elif firebase_creds_path and os.path.exists(firebase_creds_path):
-    try:
-        cred = credentials.Certificate(firebase_creds_path)
-        initialize_app(cred)
-    except Exception as e:
-        raise RuntimeError("Failed to initialize Firebase Admin SDK from file") from e
-else:
-    raise RuntimeError("Missing Firebase credentials")
+# ---------------- Firebase init (lazy: first Firebase login, not import) ----------------
+_firebase_app = None
+
+
+def get_firebase_app():
+    """Initialise the Firebase Admin SDK on first use and return the app."""
+    global _firebase_app
+    if _firebase_app is not None:
+        return _firebase_app
+
+    from firebase_admin import credentials, initialize_app
+
+    firebase_creds_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
+    firebase_creds_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
+
+    if firebase_creds_json:
+        try:
+            json_dict = json.loads(firebase_creds_json)
+            json_dict["private_key"] = json_dict["private_key"].replace("\\n", "\n")
+            cred = credentials.Certificate(json_dict)
+            _firebase_app = initialize_app(cred)
+        except Exception as e:
+            raise RuntimeError("Failed to initialize Firebase Admin SDK from JSON string") from e
+
+    elif firebase_creds_path and os.path.exists(firebase_creds_path):
+        try:
+            cred = credentials.Certificate(firebase_creds_path)
+            _firebase_app = initialize_app(cred)
+        except Exception as e:
+            raise RuntimeError("Failed to initialize Firebase Admin SDK from file") from e
+    else:
+        raise RuntimeError("Missing Firebase credentials")
+
+    return _firebase_app
 
 # ---------------- Router ----------------
 router = APIRouter()
@@ -61,7 +78,7 @@ async def signup(req: AuthRequest, db: AsyncSession = Depends(get_db)):
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = User(id=uuid.uuid4(), email=req.email, password_hash=hash_password(req.password))
+    user = User(id=uuid.uuid4(), email=req.email, password_hash=await hash_password_async(req.password))
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -90,9 +107,15 @@ async def login(req: AuthRequest, db: AsyncSession = Depends(get_db)):
 
     if not user or not user.password_hash:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    if not verify_password(req.password, user.password_hash):
+    valid, new_hash = await verify_and_update_password(req.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # ✅ Transparently upgrade hashes made with an old bcrypt cost
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     token = create_access_token({"sub": str(user.id)})
     response = JSONResponse(
         content={"token": token, "user": {"id": str(user.id), "email": user.email}}
@@ -104,7 +127,7 @@ async def login(req: AuthRequest, db: AsyncSession = Depends(get_db)):
 
 # ---------------- Me ----------------
 @router.get("/me")
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: CurrentUser = Depends(get_current_user)):
     return {
         "id": str(current_user.id),
         "email": current_user.email,
@@ -165,8 +188,16 @@ async def firebase_login(request: Request, db: AsyncSession = Depends(get_db)):
         if not id_token:
             raise HTTPException(status_code=400, detail="Missing idToken")
 
+        from firebase_admin import auth as firebase_auth, exceptions
+
+        try:
+            firebase_app = get_firebase_app()
+        except RuntimeError:
+            logger.exception("🔥 Firebase Admin SDK unavailable")
+            raise HTTPException(status_code=503, detail="Firebase login unavailable")
+
         try:
-            decoded_token = firebase_auth.verify_id_token(id_token, clock_skew_seconds=60)
+            decoded_token = firebase_auth.verify_id_token(id_token, app=firebase_app, clock_skew_seconds=60)
         except exceptions.InvalidIdTokenError:
             raise HTTPException(status_code=401, detail="Invalid Firebase token")
         except exceptions.ExpiredIdTokenError:
@@ -203,6 +234,7 @@ async def firebase_login(request: Request, db: AsyncSession = Depends(get_db)):
                 user.google_id = google_id
                 await db.commit()
                 await db.refresh(user)
+                invalidate_user(user.id)
 
             jwt_token = create_access_token({"sub": str(user.id)})
             response = JSONResponse(
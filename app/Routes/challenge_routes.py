@@ -1,23 +1,26 @@
 # app/routers/microchallenges.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_db
 from app.models import (
-    MicrochallengeDefinition,
     UserMicrochallenge,
     MicrochallengeLog,
-    User,
 )
 from datetime import datetime, date
 from uuid import UUID
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, CurrentUser
 from pydantic import BaseModel
 from typing import Optional
 from app.analytics.posthog_client import track_event
+from app.helper.challenges import challenge_store
+from app.utils.challenge_counters import log_and_count_stmt
+from app.helper.pagination import PageParams, keyset, paginate
 
 router = APIRouter()
 
+NOTES_PAGE_SIZE = 50
+
 # ----------------------
 # Helpers
 # ----------------------
@@ -28,16 +31,16 @@ def serialize_datetime(dt):
 def serialize_date(d):
     return d.isoformat() if d else None
 
+def progress_percent(log_count: int) -> float:
+    return round(((log_count or 0) / 21) * 100, 1)
+
 # ----------------------
 # Challenge Catalog
 # ----------------------
 
 @router.get("/all")
 async def list_all_challenges(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(MicrochallengeDefinition).order_by(MicrochallengeDefinition.created_at)
-    )
-    challenges = result.scalars().all()
+    challenges = await challenge_store.all(db)
     return [
         {"id": str(c.id), "title": c.title, "intro": c.intro}
         for c in challenges
@@ -52,7 +55,7 @@ async def list_all_challenges(db: AsyncSession = Depends(get_db)):
 async def assign_microchallenge(
     challenge_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     # Ensure no other active challenge
     result = await db.execute(
@@ -66,10 +69,7 @@ async def assign_microchallenge(
         raise HTTPException(status_code=400, detail="You already have an active challenge")
 
     # Ensure challenge exists
-    result = await db.execute(
-        select(MicrochallengeDefinition).where(MicrochallengeDefinition.id == challenge_id)
-    )
-    challenge = result.scalar_one_or_none()
+    challenge = await challenge_store.get(db, challenge_id)
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
 
@@ -97,20 +97,18 @@ async def assign_microchallenge(
 @router.get("/active")
 async def get_active_assignment(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     result = await db.execute(
-        select(UserMicrochallenge, MicrochallengeDefinition)
-        .join(MicrochallengeDefinition, UserMicrochallenge.challenge_id == MicrochallengeDefinition.id)
-        .where(
+        select(UserMicrochallenge).where(
             UserMicrochallenge.user_id == current_user.id,
             UserMicrochallenge.status == "active",
         )
     )
-    row = result.first()
-    if not row:
+    um = result.scalars().first()
+    mc = await challenge_store.get(db, um.challenge_id) if um else None
+    if not mc:
         raise HTTPException(status_code=404, detail="No active challenge")
-    um, mc = row
     return {
         "assignment_id": str(um.id),
         "status": um.status,
@@ -132,7 +130,7 @@ async def get_active_assignment(
 async def remove_assignment(
     assignment_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     result = await db.execute(
         select(UserMicrochallenge).where(
@@ -155,34 +153,38 @@ async def remove_assignment(
 # 🔹 Get my assigned challenges
 @router.get("/my")
 async def my_microchallenges(
+    response: Response,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
+    # log counts are denormalised on the assignment, so this is the only query
     result = await db.execute(
-        select(UserMicrochallenge, MicrochallengeDefinition)
-        .join(MicrochallengeDefinition, UserMicrochallenge.challenge_id == MicrochallengeDefinition.id)
-        .where(UserMicrochallenge.user_id == current_user.id)
+        keyset(
+            select(UserMicrochallenge).where(UserMicrochallenge.user_id == current_user.id),
+            UserMicrochallenge.started_at, UserMicrochallenge.id, page,
+        )
     )
+    assignments = paginate(result.scalars().all(), page, response, lambda um: (um.started_at, um.id))
+    definitions = await challenge_store.get_many(db, {um.challenge_id for um in assignments})
+    items = []
+    completed_any = False
 
-    rows = result.all()
-    response = []
+    for um in assignments:
+        mc = definitions.get(um.challenge_id)
+        if not mc:
+            continue
 
-    for um, mc in rows:
-        # fetch logs for this assignment
-        logs_result = await db.execute(
-            select(MicrochallengeLog).where(MicrochallengeLog.assignment_id == um.id)
-        )
-        logs = logs_result.scalars().all()
-        progress = round((len(logs) / 21) * 100, 1)
+        progress = progress_percent(um.log_count)
 
         # ✅ auto-mark completed if criteria met
-        if len(logs) >= 21 and progress >= 80 and um.status != "completed":
+        if um.log_count >= 21 and progress >= 80 and um.status != "completed":
             um.status = "completed"
             um.completed_at = datetime.utcnow()
             db.add(um)
-            await db.commit()
+            completed_any = True
 
-        response.append({
+        items.append({
             # assignment fields
             "assignment_id": str(um.id),
             "challenge_id": str(um.challenge_id),
@@ -202,7 +204,10 @@ async def my_microchallenges(
             "progress": progress,
         })
 
-    return response
+    if completed_any:
+        await db.commit()
+
+    return items
 
 
 # ----------------------
@@ -218,7 +223,7 @@ class LogTodayRequest(BaseModel):
 async def log_today(
     payload: LogTodayRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     today = date.today()
 
@@ -234,32 +239,14 @@ async def log_today(
     if not assignment:
         raise HTTPException(status_code=404, detail="Active assignment not found")
 
-    # prevent duplicate log
-    result = await db.execute(
-        select(MicrochallengeLog).where(
-            MicrochallengeLog.assignment_id == payload.assignment_id,
-            MicrochallengeLog.log_date == today,
-        )
-    )
-    if result.scalar_one_or_none():
-        return {"message": "Already logged today", "progress": assignment.progress}
-
-    # insert new log
-    new_log = MicrochallengeLog(
-        assignment_id=payload.assignment_id,
-        log_date=today,
-        note=payload.note or "",
-        created_at=datetime.utcnow(),
-    )
-    db.add(new_log)
+    # insert the log and bump the counters in one statement (no row = already logged)
+    result = await db.execute(log_and_count_stmt(payload.assignment_id, today, payload.note or ""))
+    log_count = result.scalar_one_or_none()
     await db.commit()
+    if log_count is None:
+        return {"message": "Already logged today", "progress": progress_percent(assignment.log_count)}
 
-    # count logs for progress
-    logs_result = await db.execute(
-        select(MicrochallengeLog).where(MicrochallengeLog.assignment_id == payload.assignment_id)
-    )
-    logs = logs_result.scalars().all()
-    progress = round((len(logs) / 21) * 100, 1)
+    progress = progress_percent(log_count)
 
     # ✅ mark as completed when progress ≥ 90%
     if progress >= 90 and assignment.status != "success":
@@ -280,30 +267,41 @@ async def log_today(
 
 
 
-@router.get("/progress/{assignment_id}")
-async def get_progress(
-    assignment_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    # Verify assignment
+async def get_owned_assignment(db: AsyncSession, assignment_id: UUID, user_id) -> UserMicrochallenge:
     result = await db.execute(
         select(UserMicrochallenge).where(
             UserMicrochallenge.id == assignment_id,
-            UserMicrochallenge.user_id == current_user.id,
+            UserMicrochallenge.user_id == user_id,
         )
     )
     assignment = result.scalar_one_or_none()
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
+    return assignment
 
-    # Fetch logs
+
+async def fetch_notes(db: AsyncSession, assignment_id: UUID, limit: int, offset: int) -> list:
     result = await db.execute(
-        select(MicrochallengeLog).where(MicrochallengeLog.assignment_id == assignment_id)
+        select(MicrochallengeLog.log_date, MicrochallengeLog.note)
+        .where(MicrochallengeLog.assignment_id == assignment_id)
+        .order_by(MicrochallengeLog.log_date)
+        .limit(limit)
+        .offset(offset)
     )
-    logs = result.scalars().all()
+    return [{"date": serialize_date(log_date), "note": note or ""} for log_date, note in result.all()]
+
 
-    completed_days = len(logs)
+@router.get("/progress/{assignment_id}")
+async def get_progress(
+    assignment_id: UUID,
+    include_notes: bool = True,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # Verify assignment
+    assignment = await get_owned_assignment(db, assignment_id, current_user.id)
+
+    completed_days = assignment.log_count or 0
     days_elapsed = (date.today() - assignment.started_at.date()).days + 1
     ratio = completed_days / 21 if days_elapsed >= 21 else completed_days / days_elapsed
 
@@ -327,19 +325,29 @@ async def get_progress(
         "success_ratio": round(ratio * 100, 1),
         "started_at": serialize_datetime(assignment.started_at),
         "completed_at": serialize_datetime(assignment.completed_at),
-        "notes": [{"date": serialize_date(log.log_date), "note": log.note or ""} for log in logs],
+        # a challenge spans 21 days, so the first page normally holds every note
+        "notes": await fetch_notes(db, assignment_id, limit=NOTES_PAGE_SIZE, offset=0) if include_notes else None,
     }
 
+
+@router.get("/progress/{assignment_id}/notes")
+async def get_progress_notes(
+    assignment_id: UUID,
+    limit: int = Query(NOTES_PAGE_SIZE, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    await get_owned_assignment(db, assignment_id, current_user.id)
+    return {"notes": await fetch_notes(db, assignment_id, limit, offset), "limit": limit, "offset": offset}
+
 # ----------------------
 # Get Challenge (catch-all, must be last!)
 # ----------------------
 
 @router.get("/{challenge_id}")
 async def get_challenge(challenge_id: UUID, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(MicrochallengeDefinition).where(MicrochallengeDefinition.id == challenge_id)
-    )
-    challenge = result.scalar_one_or_none()
+    challenge = await challenge_store.get(db, challenge_id)
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
 
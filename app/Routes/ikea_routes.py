@@ -1,14 +1,15 @@
 # IKEA Worksheet Backend - FastAPI + Supabase Schema Plan + Endpoints (Corrected Payload Handling)
 
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, Boolean
 from uuid import uuid4, UUID
 from datetime import date, datetime
 from app.database import get_db
-from app.models import IkeaWorksheet, IkeaTracker, User
-from app.utils.auth import get_current_user
+from app.models import IkeaWorksheet, IkeaTracker
+from app.utils.auth import get_current_user, CurrentUser
 from app.analytics.posthog_client import track_event
+from app.helper.pagination import PageParams, keyset, paginate
 
 router = APIRouter()
 
@@ -16,7 +17,7 @@ router = APIRouter()
 @router.post("/ikea/worksheet")
 async def save_worksheet(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     struggle: str = Body(...),
     identity: str = Body(...),
     knowledge: str = Body(...),
@@ -49,7 +50,7 @@ async def save_worksheet(
 @router.get("/ikea/worksheet/active")
 async def get_active_worksheet(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     result = await db.execute(
         select(IkeaWorksheet).where(IkeaWorksheet.user_id == current_user.id, IkeaWorksheet.status == 'active').limit(1)
@@ -107,11 +108,19 @@ async def toggle_tracker(
 
 # 4. Get tracker streak or history (optional)
 @router.get("/ikea/tracker/{worksheet_id}/history")
-async def get_tracker_history(worksheet_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_tracker_history(
+    worksheet_id: UUID,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
     result = await db.execute(
-        select(IkeaTracker).where(IkeaTracker.worksheet_id == worksheet_id).order_by(IkeaTracker.date)
+        keyset(
+            select(IkeaTracker).where(IkeaTracker.worksheet_id == worksheet_id),
+            IkeaTracker.date, IkeaTracker.id, page, descending=False,
+        )
     )
-    entries = result.scalars().all()
+    entries = paginate(result.scalars().all(), page, response, lambda e: (e.date, e.id))
     return [
         {
             "date": entry.date.isoformat(),
@@ -151,15 +160,19 @@ async def add_note(worksheet_id: UUID, body: dict = Body(...), db: AsyncSession
 
 @router.get("/ikea/worksheet/history")
 async def get_worksheet_history(
+    response: Response,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     result = await db.execute(
-        select(IkeaWorksheet)
-        .where(IkeaWorksheet.user_id == current_user.id, IkeaWorksheet.status == 'completed')
-        .order_by(IkeaWorksheet.created_at.desc())
+        keyset(
+            select(IkeaWorksheet)
+            .where(IkeaWorksheet.user_id == current_user.id, IkeaWorksheet.status == 'completed'),
+            IkeaWorksheet.created_at, IkeaWorksheet.id, page,
+        )
     )
-    worksheets = result.scalars().all()
+    worksheets = paginate(result.scalars().all(), page, response, lambda w: (w.created_at, w.id))
     return [
         {
             "id": str(w.id),
@@ -173,7 +186,7 @@ async def get_worksheet_history(
 async def get_worksheet_detail(
     worksheet_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     result = await db.execute(
         select(IkeaWorksheet)
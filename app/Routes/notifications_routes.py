@@ -6,7 +6,7 @@ from app.database import get_db
 from app.utils.pushnotification import send_push
 from app.utils.reminder_engine import send_spot_pushes, send_microchallenge_pushes
 import json
-from app.utils.reminder_engine import send_daily_nudge
+from app.utils.reminder_engine import send_daily_nudge as run_daily_nudge
 
 router = APIRouter()
 
@@ -15,7 +15,7 @@ from app.models import User
 
 @router.post("/send-daily-nudge")
 async def send_daily_nudge(db: AsyncSession = Depends(get_db)):
-    result = await send_daily_nudge(db)
+    result = await run_daily_nudge(db)
     return {"status": "ok", **result}
 
 @router.post("/push-spot")
@@ -1,15 +1,12 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.helper.common import get_random_active_nudge
+from app.helper.common import get_random_active_nudge, get_nudge_of_the_day
 from app.analytics.posthog_client import track_event
 
 router = APIRouter(prefix="/nudges")
 
-@router.get("/random")
-async def get_random_nudge(db: AsyncSession = Depends(get_db)):
-    nudge = await get_random_active_nudge(db)
-    track_event(None, "nudge_served", {"nudge_id": str(nudge.id)})
+def serialize_nudge(nudge):
     return {
         "id": str(nudge.id),
         "title": nudge.title,
@@ -17,3 +14,16 @@ async def get_random_nudge(db: AsyncSession = Depends(get_db)):
         "quote": nudge.quote,
         "link": nudge.link,
     }
+
+# Both endpoints are served from the in-memory catalog (no query once loaded)
+@router.get("/random")
+async def get_random_nudge(db: AsyncSession = Depends(get_db)):
+    nudge = await get_random_active_nudge(db)
+    track_event(None, "nudge_served", {"nudge_id": str(nudge.id)})
+    return serialize_nudge(nudge)
+
+@router.get("/today")
+async def get_todays_nudge(db: AsyncSession = Depends(get_db)):
+    nudge = await get_nudge_of_the_day(db)
+    track_event(None, "nudge_served", {"nudge_id": str(nudge.id), "mode": "daily"})
+    return serialize_nudge(nudge)
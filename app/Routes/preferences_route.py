@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
-from app.models import UserPreferences, User
-from app.utils.auth import get_current_user
+from app.models import UserPreferences
+from app.utils.auth import get_current_user, get_current_user_id, invalidate_user, CurrentUser
+from uuid import UUID
+from pytz import all_timezones_set
 
 router = APIRouter()
 
@@ -11,10 +13,10 @@ router = APIRouter()
 @router.get("/preferences")
 async def get_preferences(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: UUID = Depends(get_current_user_id),
 ):
     result = await db.execute(
-        select(UserPreferences).where(UserPreferences.user_id == current_user.id)
+        select(UserPreferences).where(UserPreferences.user_id == user_id)
     )
     prefs = result.scalar_one_or_none()
 
@@ -29,6 +31,7 @@ async def get_preferences(
         "notif_channel": prefs.notif_channel,
         "whatsapp_number": prefs.whatsapp_number,
         "whatsapp_verified": prefs.whatsapp_verified,
+        "timezone": prefs.timezone,
     }
 
 
@@ -36,7 +39,7 @@ async def get_preferences(
 async def update_preferences(
     updates: dict = Body(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     result = await db.execute(
         select(UserPreferences).where(UserPreferences.user_id == current_user.id)
@@ -46,6 +49,10 @@ async def update_preferences(
     if not prefs:
         raise HTTPException(status_code=404, detail="Preferences not found")
 
+    # Bad names would break the local-time reminder query for everyone
+    if updates.get("timezone") is not None and updates["timezone"] not in all_timezones_set:
+        raise HTTPException(status_code=400, detail="Unknown timezone")
+
     for field, value in updates.items():
         if hasattr(prefs, field):
             setattr(prefs, field, value)
@@ -53,6 +60,7 @@ async def update_preferences(
     db.add(prefs)
     await db.commit()
     await db.refresh(prefs)
+    invalidate_user(current_user.id)
 
     return {
         "id": str(prefs.id),
@@ -62,4 +70,5 @@ async def update_preferences(
         "notif_channel": prefs.notif_channel,
         "whatsapp_number": prefs.whatsapp_number,
         "whatsapp_verified": prefs.whatsapp_verified,
+        "timezone": prefs.timezone,
     }
@@ -1,115 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import datetime, timedelta, date
-import uuid
-import openai
-
-from app.database import get_db
-from app.models import (
-    WeeklyReflection, User, IkeaWorksheet, IkeaTracker,
-    MicrochallengeLog, MicrochallengeDefinition, CavemanSpot
+from datetime import datetime, date
+import json
+import logging
+
+from app.database import get_db, AsyncSessionLocal
+from app.models import WeeklyReflection
+from app.utils.auth import get_current_user, CurrentUser
+from app.utils.llm import get_openai_client
+from app.helper.reflections import (
+    REFLECTION_MODEL,
+    REFLECTION_MAX_TOKENS,
+    week_bounds,
+    build_reflection_prompt,
+    reflection_input_hash,
+    find_memoised_reflection,
+    complete_reflection,
+    save_reflection,
 )
-from app.utils.auth import get_current_user
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.post("/weekly-reflection/generate")
-async def generate_weekly_reflection(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    today = datetime.utcnow().date()
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
 
-    worksheet_result = await db.execute(
-        select(IkeaWorksheet).where(IkeaWorksheet.user_id == current_user.id).order_by(IkeaWorksheet.created_at.desc())
-    )
-    worksheet = worksheet_result.scalars().first()
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    if not worksheet:
-        raise HTTPException(status_code=404, detail="No IKEA worksheet found")
 
-    tracker_result = await db.execute(
-        select(IkeaTracker).where(
-            IkeaTracker.worksheet_id == worksheet.id,
-            IkeaTracker.date >= week_start,
-            IkeaTracker.date <= week_end
-        )
-    )
-    tracker_entries = tracker_result.scalars().all()
-
-    mc_log_result = await db.execute(
-        select(MicrochallengeLog, MicrochallengeDefinition)
-        .join(MicrochallengeDefinition, MicrochallengeLog.challenge_id == MicrochallengeDefinition.id)
-        .where(
-            MicrochallengeLog.user_id == current_user.id,
-            MicrochallengeLog.log_date >= week_start,
-            MicrochallengeLog.log_date <= week_end
-        )
-    )
-    mc_logs = mc_log_result.all()
+async def _replay_reflection(reflection_text: str):
+    yield _sse("done", {"reflection": reflection_text, "cached": True})
 
-    spot_result = await db.execute(
-        select(CavemanSpot).where(
-            CavemanSpot.user_id == current_user.id,
-            CavemanSpot.date >= week_start,
-            CavemanSpot.date <= week_end
+
+async def stream_reflection(prompt: str, user_id, week_start: date, week_end: date, input_hash: str | None = None):
+    """
+    Server-Sent Events: a `token` event per model delta, then `done` with the
+    full text once it is saved (or `error`). Saves in its own short session:
+    the request's session lives until the stream ends, so the endpoint commits
+    it before streaming to hand its connection back to the pool.
+    """
+    parts = []
+    try:
+        stream = await get_openai_client().chat.completions.create(
+            model=REFLECTION_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=REFLECTION_MAX_TOKENS,
+            stream=True,
         )
-    )
-    spots = spot_result.scalars().all()
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield _sse("token", {"text": delta})
+    except Exception as e:
+        logger.exception("🔥 Streaming weekly reflection failed")
+        yield _sse("error", {"detail": f"OpenAI error: {str(e)}"})
+        return
 
-    prompt = f"""
-You are a behavioral coach who understands evolutionary psychology. Based on the following logs, write a 4–6 sentence weekly reflection that validates the user's effort, connects their patterns to caveman wiring, and encourages consistency.
+    reflection_text = "".join(parts).strip()
+    try:
+        async with AsyncSessionLocal() as db:
+            await save_reflection(db, user_id, week_start, week_end, reflection_text, input_hash)
+    except Exception:
+        logger.exception("🔥 Failed to save streamed weekly reflection")
+        yield _sse("error", {"detail": "Failed to save reflection"})
+        return
 
-Identity: {worksheet.identity}
-Tiny Action: {worksheet.tiny_action}
+    yield _sse("done", {"reflection": reflection_text, "cached": False})
 
-Tracker Completions:
-"""
-    for t in tracker_entries:
-        prompt += f"- {t.date.isoformat()}: {'✅' if t.completed else '❌'} {t.note or ''}\n"
 
-    if mc_logs:
-        prompt += "\nMicrochallenge Logs:\n"
-        for log, defn in mc_logs:
-            prompt += f"- Challenge: {defn.title}, Note: {log.note or 'no note'}\n"
+@router.post("/weekly-reflection/generate")
+async def generate_weekly_reflection(
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events"),
+    force: bool = Query(False, description="Regenerate even if this week's inputs are unchanged"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    week_start, week_end = week_bounds(datetime.utcnow().date())
 
-    if spots:
-        prompt += "\nCaveman Spots:\n"
-        for spot in spots:
-            prompt += f"- {spot.description}\n"
+    prompt = await build_reflection_prompt(db, current_user.id, week_start, week_end)
+    if prompt is None:
+        raise HTTPException(status_code=404, detail="No IKEA worksheet found")
+    input_hash = reflection_input_hash(prompt)
 
-    prompt += "\nReflection:"
+    # ✅ Same inputs as an earlier generation this week: return it without calling the model
+    memoised = None if force else await find_memoised_reflection(db, current_user.id, week_start, input_hash)
 
-    try:
-        client = openai.OpenAI()
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=300
+    # End the read transaction so no pooled connection sits idle through the
+    # model call (the request session outlives a streamed body)
+    await db.commit()
+
+    if stream:
+        events = (
+            _replay_reflection(memoised.content) if memoised
+            else stream_reflection(prompt, current_user.id, week_start, week_end, input_hash)
         )
-        reflection_text = response.choices[0].message.content.strip()
+        return StreamingResponse(
+            events,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    if memoised:
+        return {"reflection": memoised.content, "cached": True}
 
+    try:
+        reflection_text = await complete_reflection(prompt)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
 
-    reflection = WeeklyReflection(
-        user_id=current_user.id,
-        content=reflection_text,
-        week_start=week_start,
-        week_end=week_end
-    )
-    db.add(reflection)
-    await db.commit()
+    await save_reflection(db, current_user.id, week_start, week_end, reflection_text, input_hash)
 
-    return {"reflection": reflection_text}
+    return {"reflection": reflection_text, "cached": False}
 
 
 @router.get("/weekly-reflection/latest")
 async def get_latest_weekly_reflection(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_db
-from app.models import CavemanSpot, User
-from app.utils.auth import get_current_user
+from app.models import CavemanSpot
+from app.utils.auth import get_current_user, get_current_user_id, CurrentUser
+from uuid import UUID
 from datetime import date, datetime
 import uuid
 from app.analytics.posthog_client import track_event
+from app.helper.pagination import PageParams, keyset, paginate
 
 router = APIRouter(prefix="/spots")
 
@@ -14,7 +16,7 @@ router = APIRouter(prefix="/spots")
 async def create_spot(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         body = await request.json()
@@ -47,16 +49,19 @@ async def create_spot(
 
 @router.get("/")
 async def get_spots(
+    response: Response,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: UUID = Depends(get_current_user_id),
 ):
     try:
         result = await db.execute(
-            select(CavemanSpot)
-            .where(CavemanSpot.user_id == current_user.id)
-            .order_by(CavemanSpot.date.desc())
+            keyset(
+                select(CavemanSpot).where(CavemanSpot.user_id == user_id),
+                CavemanSpot.date, CavemanSpot.id, page,
+            )
         )
-        spots = result.scalars().all()
+        spots = paginate(result.scalars().all(), page, response, lambda s: (s.date, s.id))
 
         return [
             {
@@ -67,5 +72,7 @@ async def get_spots(
             }
             for s in spots
         ]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
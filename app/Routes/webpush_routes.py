@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import delete
-from app.models import WebPushSubscription, User
+from app.models import WebPushSubscription
 from app.database import get_db
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, CurrentUser
 
 router = APIRouter()
 
@@ -12,7 +12,7 @@ router = APIRouter()
 async def register_webpush(
     payload: dict = Body(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     endpoint = payload.get("endpoint")
     keys = payload.get("keys")
@@ -40,7 +40,7 @@ async def register_webpush(
 @router.post("/unregister-webpush")
 async def unregister_webpush(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         stmt = delete(WebPushSubscription).where(WebPushSubscription.user_id == current_user.id)
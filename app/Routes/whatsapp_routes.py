@@ -6,12 +6,9 @@ from uuid import uuid4
 from datetime import datetime, date
 from fastapi.responses import JSONResponse
 
-
-import os
-import requests
-
 from app.database import get_db
 from app.models import User, CavemanSpot
+from app.utils.whatsapp import send_whatsapp_message
 
 router = APIRouter()
 logger = logging.getLogger("whatsapp")
@@ -58,8 +55,8 @@ async def whatsapp_webhook(
         await db.commit()
 
         # Send auto-reply
-        status, response = send_whatsapp_message(from_number, "🔥 Got it. Your caveman has been spotted and logged. Nice awareness!")
-        logger.info("📤 Auto-reply sent to %s | Status: %s", from_number, status)
+        reply = await send_whatsapp_message(from_number, "🔥 Got it. Your caveman has been spotted and logged. Nice awareness!")
+        logger.info("📤 Auto-reply sent to %s | Status: %s", from_number, reply.status_code)
 
 
         logger.info("✅ Spot logged for user %s (%s)", user.name, from_number)
@@ -69,27 +66,3 @@ async def whatsapp_webhook(
         logger.exception("🔥 Error processing WhatsApp message: %s", e)
         return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
-
-def send_whatsapp_message(to_number: str, message: str) -> bool:
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    from_number = os.getenv("TWILIO_WHATSAPP_NUMBER")
-
-    url = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json"
-    data = {
-        "From": from_number,
-        "To": f"whatsapp:{to_number}",
-        "Body": message,
-    }
-
-    try:
-        response = requests.post(url, data=data, auth=(account_sid, auth_token))
-        if response.status_code == 201:
-            logger.info("✅ WhatsApp message sent to %s", to_number)
-            return True
-        else:
-            logger.warning("⚠️ Failed to send WhatsApp message to %s | %s", to_number, response.text)
-            return False
-    except Exception as e:
-        logger.exception("🔥 Error sending WhatsApp message to %s", to_number)
-        return False
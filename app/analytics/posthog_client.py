@@ -1,4 +1,3 @@
-from posthog import Posthog
 from app.config import settings
 
 API_KEY = settings.POSTHOG_API_KEY
@@ -6,10 +5,17 @@ HOST = settings.POSTHOG_HOST or "https://app.posthog.com"
 
 # Internal flag to avoid errors in local/dev
 _enabled = bool(API_KEY)
-_client: Posthog | None = None
+_client = None
 
-if _enabled:
-    _client = Posthog(project_api_key=API_KEY, host=HOST)
+
+def get_client():
+    """Create the PostHog client on first use, so importing this module stays cheap."""
+    global _client
+    if _client is None and _enabled:
+        from posthog import Posthog
+
+        _client = Posthog(project_api_key=API_KEY, host=HOST)
+    return _client
 
 
 def track_event(user_id: str | None, event: str, properties: dict | None = None):
@@ -21,12 +27,13 @@ def track_event(user_id: str | None, event: str, properties: dict | None = None)
         event: Event name.
         properties: Extra metadata.
     """
-    if not _client:
+    client = get_client()
+    if not client:
         # Local dev: don't crash, just log
         print(f"[DEV] Event skipped: {event}, props={properties}")
         return
 
-    _client.capture(
+    client.capture(
         distinct_id=user_id or "anonymous",
         event=event,
         properties=properties or {},
@@ -37,11 +44,12 @@ def identify_user(user_id: str, traits: dict | None = None):
     """
     Identify or update user profile in PostHog.
     """
-    if not _client:
+    client = get_client()
+    if not client:
         print(f"[DEV] Identify skipped: {user_id}, traits={traits}")
         return
 
-    _client.identify(
+    client.identify(
         distinct_id=user_id,
         properties=traits or {},
     )
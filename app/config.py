@@ -11,6 +11,42 @@ class Settings:
     GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
     VAPID_PRIVATE_KEY = os.getenv("VAPID_PRIVATE_KEY")
     VAPID_CLAIMS_EMAIL = os.getenv("VAPID_CLAIMS_EMAIL")
+    PUSH_CONCURRENCY = int(os.getenv("PUSH_CONCURRENCY", "50"))  # max in-flight push requests
+    PUSH_TIMEOUT = float(os.getenv("PUSH_TIMEOUT", "10"))  # seconds
+    PUSH_TTL = int(os.getenv("PUSH_TTL", "0"))  # seconds a push service holds an undelivered message
+    TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+    TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+    TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER")
+    WHATSAPP_CONCURRENCY = int(os.getenv("WHATSAPP_CONCURRENCY", "20"))  # max in-flight Twilio requests
+    WHATSAPP_TIMEOUT = float(os.getenv("WHATSAPP_TIMEOUT", "10"))  # seconds
+    OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))  # parallel drain workers per process
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))  # rows claimed per transaction
+    OUTBOX_MAX_AGE_HOURS = int(os.getenv("OUTBOX_MAX_AGE_HOURS", "6"))  # older pending rows are dropped, not sent late
+    SCHEDULER_LOCK_KEY = int(os.getenv("SCHEDULER_LOCK_KEY", "724137"))  # pg advisory lock id for scheduler leadership
+    LEADER_CHECK_SECONDS = int(os.getenv("LEADER_CHECK_SECONDS", "15"))  # election / lease heartbeat interval
+    SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "fixed")  # fixed: one IST burst | local: per-user local time
+    DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Asia/Kolkata")  # for users without a timezone preference
+    LOCAL_SLOT_INTERVAL_MINUTES = int(os.getenv("LOCAL_SLOT_INTERVAL_MINUTES", "5"))  # how often local mode runs
+    LOCAL_SLOT_WINDOW_MINUTES = int(os.getenv("LOCAL_SLOT_WINDOW_MINUTES", "60"))  # catch-up window after a slot
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))  # seconds an authenticated user is served from memory
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "20000"))  # verified JWTs kept in memory
+    TOKEN_CACHE_MAX_TTL = int(os.getenv("TOKEN_CACHE_MAX_TTL", "900"))  # cap; entries also expire at the token's exp
+    CACHE_STATS_LOG_SECONDS = int(os.getenv("CACHE_STATS_LOG_SECONDS", "900"))  # how often each process logs auth cache hit/miss counts
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # changing it rehashes passwords on next login
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # threads reserved for bcrypt
+    NUDGE_CATALOG_TTL = int(os.getenv("NUDGE_CATALOG_TTL", "300"))  # seconds before active nudges are reloaded; the most an edit can lag per worker
+    NUDGE_OF_THE_DAY = os.getenv("NUDGE_OF_THE_DAY", "false").lower() == "true"  # daily job sends one stable nudge per day
+    CHALLENGE_STORE_TTL = int(os.getenv("CHALLENGE_STORE_TTL", "3600"))  # seconds before definitions are reloaded; the most an edit can lag per worker
+    READ_FLUSH_SECONDS = float(os.getenv("READ_FLUSH_SECONDS", "10"))  # max window of buffered article reads lost on a crash
+    ARTICLE_SLUG_TTL = int(os.getenv("ARTICLE_SLUG_TTL", "600"))  # seconds the slug -> id map is served from memory
+    READ_BUFFER_MAX_SLUGS = int(os.getenv("READ_BUFFER_MAX_SLUGS", "1000"))  # flush early past this many distinct slugs
+    SAVED_CACHE_TTL = int(os.getenv("SAVED_CACHE_TTL", "30"))  # seconds a user's saved-slugs list may lag writes on other workers
+    SAVED_CACHE_SIZE = int(os.getenv("SAVED_CACHE_SIZE", "10000"))  # users kept in the saved-article cache
+    LEADERBOARD_TTL = int(os.getenv("LEADERBOARD_TTL", "60"))  # seconds between top-articles rebuilds
+    REFLECTION_BATCH_CONCURRENCY = int(os.getenv("REFLECTION_BATCH_CONCURRENCY", "4"))  # parallel LLM calls in the weekly batch
+    REFLECTION_BATCH_SIZE = int(os.getenv("REFLECTION_BATCH_SIZE", "50"))  # users per chunk between cursor saves
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))  # seconds per completion request
     POSTHOG_API_KEY = os.getenv("POSTHOG_API_KEY", "")
     POSTHOG_HOST = os.getenv("POSTHOG_HOST")
 
@@ -1,3 +1,6 @@
+import asyncio
+import logging
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
@@ -17,6 +20,28 @@ engine = create_async_engine(
 AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+
+async def prewarm_pool(size: int | None = None) -> int:
+    """
+    Open `size` pooled connections concurrently (default: the pool size) so the
+    first requests after boot skip the connect + TLS handshake. Returns how
+    many connections were warmed.
+    """
+    size = size or engine.pool.size()
+
+    async def touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(touch() for _ in range(size)), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        logger.warning(f"⚠️ DB pool pre-warm: {len(failed)}/{size} connections failed ({failed[0]!r})")
+    return size - len(failed)
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
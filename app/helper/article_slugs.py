@@ -0,0 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.config import settings
+from app.models import Article
+from app.helper.catalog import TTLCatalog
+
+
+class ArticleSlugCatalog(TTLCatalog):
+    """slug -> article id for every article, so hot paths can reject unknown slugs without a query."""
+
+    def __init__(self, ttl: int):
+        super().__init__(ttl)
+        self._by_slug: dict = {}
+
+    async def _fetch(self, db: AsyncSession) -> list:
+        result = await db.execute(select(Article.slug, Article.id))
+        return result.all()
+
+    def _index(self, items: list):
+        self._by_slug = {slug: article_id for slug, article_id in items}
+
+    async def get_id(self, db: AsyncSession, slug: str):
+        await self.items(db)
+        article_id = self._by_slug.get(slug)
+        if article_id is None:
+            await self.reload_on_miss(db)  # maybe published since the last load
+            article_id = self._by_slug.get(slug)
+        return article_id
+
+
+article_slugs = ArticleSlugCatalog(ttl=settings.ARTICLE_SLUG_TTL)
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# A miss may mean a row was added elsewhere; reload, but not more often than this
+MISS_RELOAD_SECONDS = 30
+
+
+class TTLCatalog:
+    """
+    A small table loaded wholesale into memory and reloaded once the TTL
+    lapses. Rows are edited directly in the database, outside the API, so
+    nothing signals a change: the TTL is the only refresh, and each worker
+    may serve an edit's old version for up to `ttl` seconds. (Lookup misses
+    also reload early, see reload_on_miss.)
+
+    Subclasses implement `_fetch(db)` returning the items to keep, and may
+    override `_index(items)` to build lookups.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._items: list = []
+        self._loaded_at = 0.0
+        self._version = 0
+        self._loaded_version = -1
+        self._lock = asyncio.Lock()
+
+    async def _fetch(self, db: AsyncSession) -> list:
+        raise NotImplementedError
+
+    def _index(self, items: list):
+        pass
+
+    def invalidate(self):
+        """Force a reload on this worker's next read (tests, shell sessions); other workers wait for their TTL."""
+        self._version += 1
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_version == self._version and time.monotonic() - self._loaded_at < self.ttl
+
+    async def load(self, db: AsyncSession, loaded_before: float | None = None):
+        """
+        Reload if stale. With `loaded_before` (a `_loaded_at` the caller saw),
+        also reload a fresh catalog, unless another coroutine already reloaded
+        it while this one waited for the lock.
+        """
+        async with self._lock:
+            outdated = loaded_before is not None and self._loaded_at <= loaded_before
+            if self._is_fresh() and not outdated:
+                return
+            version = self._version
+            items = await self._fetch(db)
+            self._items = items
+            self._index(items)
+            self._loaded_at = time.monotonic()
+            self._loaded_version = version
+
+    async def items(self, db: AsyncSession) -> list:
+        if not self._is_fresh():
+            await self.load(db)
+        return self._items
+
+    async def reload_on_miss(self, db: AsyncSession):
+        """After a lookup miss: reload, at most once per MISS_RELOAD_SECONDS; concurrent misses share one reload."""
+        seen = self._loaded_at
+        if time.monotonic() - seen > MISS_RELOAD_SECONDS:
+            await self.load(db, loaded_before=seen)
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.config import settings
+from app.models import MicrochallengeDefinition
+from app.helper.catalog import TTLCatalog
+
+
+@dataclass(frozen=True)
+class ChallengeDefinition:
+    """Detached copy of a MicrochallengeDefinition row."""
+    id: object
+    title: str
+    intro: list
+    instructions: list
+    why: str
+    tips: list
+    closing: str
+    created_at: datetime | None
+
+
+class ChallengeDefinitionStore(TTLCatalog):
+    """Microchallenge definitions held in memory, keyed by id. Preloaded at startup."""
+
+    def __init__(self, ttl: int):
+        super().__init__(ttl)
+        self._by_id: dict = {}
+
+    async def _fetch(self, db: AsyncSession) -> list[ChallengeDefinition]:
+        result = await db.execute(
+            select(MicrochallengeDefinition).order_by(MicrochallengeDefinition.created_at)
+        )
+        return [
+            ChallengeDefinition(
+                id=c.id,
+                title=c.title,
+                intro=c.intro,
+                instructions=c.instructions,
+                why=c.why,
+                tips=c.tips,
+                closing=c.closing,
+                created_at=c.created_at,
+            )
+            for c in result.scalars().all()
+        ]
+
+    def _index(self, items: list[ChallengeDefinition]):
+        self._by_id = {c.id: c for c in items}
+
+    async def all(self, db: AsyncSession) -> list[ChallengeDefinition]:
+        return await self.items(db)
+
+    async def get(self, db: AsyncSession, challenge_id) -> ChallengeDefinition | None:
+        if not self._is_fresh():
+            await self.load(db)
+        definition = self._by_id.get(challenge_id)
+        if definition is None:
+            await self.reload_on_miss(db)
+            definition = self._by_id.get(challenge_id)
+        return definition
+
+    async def get_many(self, db: AsyncSession, challenge_ids) -> dict:
+        if not self._is_fresh():
+            await self.load(db)
+        if any(cid not in self._by_id for cid in challenge_ids):
+            await self.reload_on_miss(db)
+        return {cid: self._by_id[cid] for cid in challenge_ids if cid in self._by_id}
+
+
+challenge_store = ChallengeDefinitionStore(ttl=settings.CHALLENGE_STORE_TTL)
+
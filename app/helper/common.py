@@ -1,16 +1,61 @@
+import hashlib
 import random
+from dataclasses import dataclass
+from datetime import date
 from fastapi import HTTPException   
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select    
+from app.config import settings
 from app.models import BehavioralNudge
+from app.helper.catalog import TTLCatalog
 
-async def get_random_active_nudge(db: AsyncSession) -> BehavioralNudge:
-    result = await db.execute(
-        select(BehavioralNudge).where(BehavioralNudge.is_active == True)
-    )
-    nudges = result.scalars().all()
 
-    if not nudges:
-        raise HTTPException(status_code=404, detail="No active nudges available")
+@dataclass(frozen=True)
+class NudgeSnapshot:
+    """Detached copy of an active BehavioralNudge, safe to share across requests."""
+    id: object
+    title: str | None
+    paragraphs: list
+    quote: str | None
+    link: str | None
 
-    return random.choice(nudges)
+
+class NudgeCatalog(TTLCatalog):
+    """Active nudges held in memory; picks are O(1) from the preloaded list."""
+
+    async def _fetch(self, db: AsyncSession) -> list[NudgeSnapshot]:
+        result = await db.execute(
+            select(BehavioralNudge)
+            .where(BehavioralNudge.is_active == True)
+            .order_by(BehavioralNudge.created_at, BehavioralNudge.id)
+        )
+        return [
+            NudgeSnapshot(id=n.id, title=n.title, paragraphs=n.paragraphs or [], quote=n.quote, link=n.link)
+            for n in result.scalars().all()
+        ]
+
+    async def _active(self, db: AsyncSession) -> list[NudgeSnapshot]:
+        nudges = await self.items(db)
+        if not nudges:
+            raise HTTPException(status_code=404, detail="No active nudges available")
+        return nudges
+
+    async def random(self, db: AsyncSession) -> NudgeSnapshot:
+        return random.choice(await self._active(db))
+
+    async def of_the_day(self, db: AsyncSession, day: date | None = None) -> NudgeSnapshot:
+        # Same pick for the whole day on every worker, as long as the catalog matches
+        nudges = await self._active(db)
+        digest = hashlib.sha256((day or date.today()).isoformat().encode()).hexdigest()
+        return nudges[int(digest, 16) % len(nudges)]
+
+
+nudge_catalog = NudgeCatalog(ttl=settings.NUDGE_CATALOG_TTL)
+
+
+async def get_random_active_nudge(db: AsyncSession) -> NudgeSnapshot:
+    return await nudge_catalog.random(db)
+
+
+async def get_nudge_of_the_day(db: AsyncSession, day: date | None = None) -> NudgeSnapshot:
+    return await nudge_catalog.of_the_day(db, day)
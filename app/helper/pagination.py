@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination on (sort column, id).
+
+List endpoints keep returning their original body shape; the cursor for the
+next page goes in the X-Next-Cursor response header and is absent on the
+last page.
+"""
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_PARSERS = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    uuid.UUID: uuid.UUID,
+}
+
+
+class PageParams:
+    """Query parameters shared by every paginated endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    raw = json.dumps([sort_value.isoformat() if sort_value is not None else None, str(row_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_col, id_col) -> tuple:
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (
+            _PARSERS[sort_col.type.python_type](sort_value) if sort_value is not None else None,
+            _PARSERS[id_col.type.python_type](row_id),
+        )
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(sort_col, id_col, sort_value, row_id, descending: bool):
+    """
+    Rows past (sort_value, row_id). Postgres sorts NULL above every value (first
+    when descending, last when ascending), so NULL sort keys get their own
+    segment instead of dropping out of the tuple comparison.
+    """
+    if sort_value is None:
+        in_nulls = and_(sort_col.is_(None), id_col < row_id if descending else id_col > row_id)
+        return or_(in_nulls, sort_col.isnot(None)) if descending else in_nulls
+
+    row, bound = tuple_(sort_col, id_col), tuple_(sort_value, row_id)
+    return row < bound if descending else or_(row > bound, sort_col.is_(None))
+
+
+def keyset(stmt, sort_col, id_col, page: PageParams, descending: bool = True):
+    """
+    Order `stmt` by (sort_col, id_col), start after the cursor and fetch one
+    row more than the page size so the caller can tell whether a next page exists.
+    """
+    if page.cursor:
+        stmt = stmt.where(_after(sort_col, id_col, *decode_cursor(page.cursor, sort_col, id_col), descending))
+
+    if descending:
+        stmt = stmt.order_by(sort_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(sort_col.asc(), id_col.asc())
+    return stmt.limit(page.limit + 1)
+
+
+def paginate(rows, page: PageParams, response: Response, key) -> list:
+    """
+    Trim the look-ahead row and set the next-page cursor header.
+    `key(row)` returns the row's (sort value, id).
+    """
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
@@ -0,0 +1,185 @@
+"""
+Weekly reflection generation shared by the API (on demand) and the
+scheduler (batch pre-generation of the week that just ended).
+"""
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, union_all, literal, cast, null, Date, Boolean, Text
+from app.models import (
+    WeeklyReflection, IkeaWorksheet, IkeaTracker,
+    MicrochallengeLog, MicrochallengeDefinition, UserMicrochallenge, CavemanSpot
+)
+from app.database import AsyncSessionLocal
+from app.utils.llm import get_openai_client
+
+REFLECTION_MODEL = "gpt-4"
+REFLECTION_MAX_TOKENS = 300
+
+
+def week_bounds(day: date) -> tuple[date, date]:
+    """Monday and Sunday of the week containing `day`."""
+    week_start = day - timedelta(days=day.weekday())
+    return week_start, week_start + timedelta(days=6)
+
+
+@dataclass(frozen=True)
+class ReflectionContext:
+    """Everything one user's weekly reflection prompt is built from."""
+    identity: str
+    tiny_action: str
+    tracker: list = field(default_factory=list)  # [(date, completed, note)]
+    logs: list = field(default_factory=list)     # [(log date, challenge title, note)]
+    spots: list = field(default_factory=list)    # [(date, description)]
+
+
+def reflection_context_stmt(user_id, week_start: date, week_end: date):
+    """
+    One round trip for every weekly input: a UNION ALL of typed rows
+    (kind, day, completed, text, note) over the latest worksheet, its tracker
+    entries, the user's microchallenge logs and their spots.
+    """
+    worksheet = (
+        select(IkeaWorksheet.id, IkeaWorksheet.identity, IkeaWorksheet.tiny_action)
+        .where(IkeaWorksheet.user_id == user_id)
+        .order_by(IkeaWorksheet.created_at.desc())
+        .limit(1)
+        .cte("worksheet")
+    )
+    no_day, no_flag, no_text = cast(null(), Date), cast(null(), Boolean), cast(null(), Text)
+
+    return union_all(
+        select(
+            literal("worksheet").label("kind"), no_day.label("day"), no_flag.label("completed"),
+            worksheet.c.identity.label("text"), worksheet.c.tiny_action.label("note"),
+        ),
+        select(literal("tracker"), IkeaTracker.date, IkeaTracker.completed, no_text, IkeaTracker.note)
+        .join(worksheet, IkeaTracker.worksheet_id == worksheet.c.id)
+        .where(IkeaTracker.date.between(week_start, week_end)),
+        # Logs belong to an assignment; the user and the challenge are on UserMicrochallenge
+        select(literal("log"), MicrochallengeLog.log_date, no_flag, MicrochallengeDefinition.title, MicrochallengeLog.note)
+        .join(UserMicrochallenge, MicrochallengeLog.assignment_id == UserMicrochallenge.id)
+        .join(MicrochallengeDefinition, UserMicrochallenge.challenge_id == MicrochallengeDefinition.id)
+        .where(UserMicrochallenge.user_id == user_id, MicrochallengeLog.log_date.between(week_start, week_end)),
+        select(literal("spot"), CavemanSpot.date, no_flag, CavemanSpot.description, no_text)
+        .where(CavemanSpot.user_id == user_id, CavemanSpot.date.between(week_start, week_end)),
+    )
+
+
+async def load_reflection_context(db: AsyncSession, user_id, week_start: date, week_end: date) -> ReflectionContext | None:
+    """The week's inputs, or None if the user has no IKEA worksheet yet."""
+    rows = (await db.execute(reflection_context_stmt(user_id, week_start, week_end))).all()
+
+    worksheet = next((r for r in rows if r.kind == "worksheet"), None)
+    if worksheet is None:
+        return None
+
+    def pick(kind):
+        # Sorted so the same inputs always render the same prompt (and input hash)
+        return sorted((r for r in rows if r.kind == kind), key=lambda r: (r.day, r.text or "", r.note or ""))
+
+    return ReflectionContext(
+        identity=worksheet.text,
+        tiny_action=worksheet.note,
+        tracker=[(r.day, r.completed, r.note) for r in pick("tracker")],
+        logs=[(r.day, r.text, r.note) for r in pick("log")],
+        spots=[(r.day, r.text) for r in pick("spot")],
+    )
+
+
+def render_reflection_prompt(ctx: ReflectionContext) -> str:
+    prompt = f"""
+You are a behavioral coach who understands evolutionary psychology. Based on the following logs, write a 4–6 sentence weekly reflection that validates the user's effort, connects their patterns to caveman wiring, and encourages consistency.
+
+Identity: {ctx.identity}
+Tiny Action: {ctx.tiny_action}
+
+Tracker Completions:
+"""
+    for day, completed, note in ctx.tracker:
+        prompt += f"- {day.isoformat()}: {'✅' if completed else '❌'} {note or ''}\n"
+
+    if ctx.logs:
+        prompt += "\nMicrochallenge Logs:\n"
+        for _, title, note in ctx.logs:
+            prompt += f"- Challenge: {title}, Note: {note or 'no note'}\n"
+
+    if ctx.spots:
+        prompt += "\nCaveman Spots:\n"
+        for _, description in ctx.spots:
+            prompt += f"- {description}\n"
+
+    prompt += "\nReflection:"
+    return prompt
+
+
+async def build_reflection_prompt(db: AsyncSession, user_id, week_start: date, week_end: date) -> str | None:
+    """The prompt for one user's week, or None if they have no IKEA worksheet yet."""
+    ctx = await load_reflection_context(db, user_id, week_start, week_end)
+    return render_reflection_prompt(ctx) if ctx else None
+
+
+def reflection_input_hash(prompt: str) -> str:
+    """The prompt carries every weekly input; the model settings are hashed too so a model change regenerates."""
+    key = f"{REFLECTION_MODEL}|{REFLECTION_MAX_TOKENS}|{prompt}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+async def find_memoised_reflection(db: AsyncSession, user_id, week_start: date, input_hash: str):
+    result = await db.execute(
+        select(WeeklyReflection)
+        .where(
+            WeeklyReflection.user_id == user_id,
+            WeeklyReflection.week_start == week_start,
+            WeeklyReflection.input_hash == input_hash,
+        )
+        .order_by(WeeklyReflection.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def complete_reflection(prompt: str) -> str:
+    response = await get_openai_client().chat.completions.create(
+        model=REFLECTION_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=REFLECTION_MAX_TOKENS
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def save_reflection(db: AsyncSession, user_id, week_start: date, week_end: date, content: str, input_hash: str):
+    reflection = WeeklyReflection(
+        user_id=user_id,
+        content=content,
+        week_start=week_start,
+        week_end=week_end,
+        input_hash=input_hash
+    )
+    db.add(reflection)
+    await db.commit()
+    return reflection
+
+
+async def generate_reflection(user_id, week_start: date, week_end: date, force: bool = False):
+    """
+    Build, memoise-check, generate and save one reflection.
+    Returns (text, cached), or (None, False) when the user has no worksheet.
+    Inputs are read and the result saved in separate short sessions, so no
+    pooled connection is held while the model call is in flight.
+    """
+    async with AsyncSessionLocal() as db:
+        prompt = await build_reflection_prompt(db, user_id, week_start, week_end)
+        if prompt is None:
+            return None, False
+
+        input_hash = reflection_input_hash(prompt)
+        memoised = None if force else await find_memoised_reflection(db, user_id, week_start, input_hash)
+    if memoised:
+        return memoised.content, True
+
+    content = await complete_reflection(prompt)
+    async with AsyncSessionLocal() as db:
+        await save_reflection(db, user_id, week_start, week_end, content, input_hash)
+    return content, False
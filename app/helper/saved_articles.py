@@ -0,0 +1,78 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import exists
+from sqlalchemy.future import select
+from app.config import settings
+from app.models import Article, SavedArticle
+from app.utils.cache import TTLCache
+
+# Upper bound on slugs accepted by one saved-status lookup
+MAX_STATUS_SLUGS = 100
+
+_saved_cache = TTLCache(maxsize=settings.SAVED_CACHE_SIZE, ttl=settings.SAVED_CACHE_TTL)
+
+
+def invalidate_saved(user_id):
+    """Drop a user's cached saved set after they save or unsave an article."""
+    _saved_cache.pop(str(user_id))
+
+
+async def get_saved_slugs(db: AsyncSession, user_id) -> frozenset:
+    """
+    Slugs of every article the user has saved, cached per user for
+    SAVED_CACHE_TTL. Only this worker's writes invalidate the entry, so keep
+    the TTL short and don't use it for single-article checks.
+    """
+    key = str(user_id)
+    cached = _saved_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        select(Article.slug)
+        .join(SavedArticle, SavedArticle.article_id == Article.id)
+        .where(SavedArticle.user_id == user_id)
+    )
+    slugs = frozenset(result.scalars().all())
+    _saved_cache.set(key, slugs)
+    return slugs
+
+
+async def is_saved(db: AsyncSession, user_id, slug: str) -> bool | None:
+    """
+    Whether the user saved the article, read straight from the database
+    (an EXISTS on the uq_user_article index). None if the slug is unknown.
+    """
+    saved = exists().where(
+        SavedArticle.user_id == user_id,
+        SavedArticle.article_id == Article.id,
+    )
+    result = await db.execute(select(saved.label("is_saved")).where(Article.slug == slug))
+    return result.scalar_one_or_none()
+
+
+async def get_saved_status(db: AsyncSession, user_id, slugs: list[str]) -> dict:
+    """
+    Saved flag and counters for each known slug, in one query. Unknown slugs
+    are left out of the result.
+    """
+    result = await db.execute(
+        select(
+            Article.slug,
+            Article.read_count,
+            Article.save_count,
+            SavedArticle.id.isnot(None).label("is_saved"),
+        )
+        .outerjoin(
+            SavedArticle,
+            (SavedArticle.article_id == Article.id) & (SavedArticle.user_id == user_id),
+        )
+        .where(Article.slug.in_(slugs))
+    )
+    return {
+        row.slug: {
+            "isSaved": row.is_saved,
+            "read_count": row.read_count,
+            "save_count": row.save_count,
+        }
+        for row in result.all()
+    }
@@ -14,16 +14,20 @@ from app.Routes import (
     nudge_routes,
     preferences_route
 )
-from app.database import Base, engine
-from app.utils.scheduler import start_scheduler 
+from app.database import AsyncSessionLocal, prewarm_pool
+from app.helper.challenges import challenge_store
+from app.utils.scheduler import start_scheduler, scheduler
+from app.utils.leader import release_leadership
+from app.utils.read_counter import start_read_counter, stop_read_counter
+from app.utils.pushnotification import close_push_client
+from app.utils.whatsapp import close_whatsapp_client
+from app.utils.llm import close_openai_client
 from fastapi.middleware.cors import CORSMiddleware
-import openai
-import os
+from app.helper.pagination import NEXT_CURSOR_HEADER
+import asyncio
+import logging
 
-# ✅ Set OpenAI API key globally
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if not openai.api_key:
-    raise RuntimeError("OpenAI API key not set. Please define OPENAI_API_KEY in environment.")
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -38,14 +42,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # lets the browser read pagination cursors
 )
 
-# ✅ DB initialization on startup
+_warmup_task: asyncio.Task | None = None
+
+
+async def warm_up():
+    """Fill the DB pool and preload microchallenge definitions without delaying boot."""
+    try:
+        await prewarm_pool()
+        async with AsyncSessionLocal() as db:
+            await challenge_store.load(db)  # ✅ Otherwise loaded by the first request that needs it
+    except Exception:
+        logger.exception("⚠️ Background warm-up failed")
+
+
+# ✅ Startup (schema is managed by `python -m app.migrations upgrade`, not here)
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    global _warmup_task
+    _warmup_task = asyncio.create_task(warm_up())
     start_scheduler()  # ✅ Start APScheduler
+    start_read_counter()  # ✅ Periodic flush of buffered article reads
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if _warmup_task and not _warmup_task.done():
+        _warmup_task.cancel()
+    scheduler.shutdown(wait=False)
+    await release_leadership()  # ✅ Let another worker take over the cron jobs right away
+    await stop_read_counter()  # ✅ Flush buffered article reads before exiting
+    await close_push_client()  # ✅ Release pooled push connections
+    await close_whatsapp_client()
+    await close_openai_client()
 
 # ✅ Mount routers (perfect mounting structure)
 app.include_router(webpush_routes.router, prefix="/api")
@@ -0,0 +1,17 @@
+"""
+Versioned schema migrations.
+
+    python -m app.migrations upgrade    # apply pending migrations (run before the app starts)
+    python -m app.migrations status     # list migrations and whether they are applied
+    python -m app.migrations explain    # EXPLAIN the hot-path queries against this database
+
+Migrations live in app/migrations/versions as NNNN_name.py modules that define
+`revision`, `description` and `async def upgrade(conn)`. Set
+`transactional = False` for statements that cannot run in a transaction
+(e.g. CREATE INDEX CONCURRENTLY, via app.migrations.ops). Write DDL out
+in full rather than from app.models, so a revision keeps doing what it did
+when it was written. Applied revisions are recorded in schema_migrations.
+"""
+from app.migrations.runner import discover, upgrade, status
+
+__all__ = ["discover", "upgrade", "status"]
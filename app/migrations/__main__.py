@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.migrations.runner import upgrade, status
+from app.migrations.explain import explain, seq_scans
+
+
+async def main(command: str, strict: bool = False) -> int:
+    if command == "upgrade":
+        await upgrade()
+    elif command == "status":
+        for migration, applied in await status():
+            print(f"{'✅' if applied else '⏳'} {migration.revision}  {migration.description}")
+    elif command == "explain":
+        plans = await explain()
+        for name, lines in plans.items():
+            print(f"\n== {name}")
+            print("\n".join(lines))
+        flagged = seq_scans(plans)
+        if flagged:
+            print(f"\n⚠️ Sequential scans: {', '.join(flagged)}")
+            return 1 if strict else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    parser.add_argument("command", choices=["upgrade", "status", "explain"])
+    parser.add_argument("--strict", action="store_true", help="explain: exit 1 if any hot query seq-scans")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main(args.command, args.strict)))
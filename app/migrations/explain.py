@@ -0,0 +1,58 @@
+"""
+EXPLAIN the hot-path queries so a missing index shows up as a Seq Scan.
+Tiny tables are often seq-scanned even with an index in place, so read the
+report against a database with realistic row counts.
+"""
+import logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+PAGE = 51  # default page size + look-ahead row
+
+HOT_QUERIES = {
+    "spots page": f"SELECT * FROM spots WHERE user_id = :uid ORDER BY date DESC, id DESC LIMIT {PAGE}",
+    "spotted today": "SELECT id FROM spots WHERE user_id = :uid AND date = current_date LIMIT 1",
+    "active microchallenges": "SELECT id FROM user_microchallenges WHERE user_id = :uid AND status = 'active'",
+    "microchallenges page": (
+        "SELECT * FROM user_microchallenges WHERE user_id = :uid "
+        f"ORDER BY started_at DESC, id DESC LIMIT {PAGE}"
+    ),
+    "push subscriptions": "SELECT * FROM web_push_subscriptions WHERE user_id = :uid",
+    "active worksheet": (
+        "SELECT * FROM ikea_worksheet WHERE user_id = :uid AND status = 'active' "
+        "ORDER BY created_at DESC LIMIT 1"
+    ),
+    "worksheet history": (
+        "SELECT * FROM ikea_worksheet WHERE user_id = :uid AND status = 'completed' "
+        f"ORDER BY created_at DESC, id DESC LIMIT {PAGE}"
+    ),
+    "latest reflection": "SELECT * FROM weekly_reflections WHERE user_id = :uid ORDER BY created_at DESC LIMIT 1",
+    "saved articles page": (
+        "SELECT * FROM saved_articles WHERE user_id = :uid "
+        f"ORDER BY created_at DESC, id DESC LIMIT {PAGE}"
+    ),
+}
+
+
+async def explain(engine: AsyncEngine | None = None) -> dict[str, list[str]]:
+    """Return {query name: plan lines} for every hot query, using a real user id when one exists."""
+    if engine is None:
+        from app.database import engine
+
+    plans = {}
+    async with engine.connect() as conn:
+        uid = (await conn.execute(text("SELECT id FROM users LIMIT 1"))).scalar()
+        if uid is None:
+            uid = (await conn.execute(text("SELECT gen_random_uuid()"))).scalar()
+
+        for name, sql in HOT_QUERIES.items():
+            result = await conn.execute(text(f"EXPLAIN {sql}"), {"uid": uid})
+            plans[name] = [line for (line,) in result.all()]
+    return plans
+
+
+def seq_scans(plans: dict[str, list[str]]) -> list[str]:
+    """Names of the queries whose plan contains a sequential scan."""
+    return [name for name, lines in plans.items() if any("Seq Scan" in line for line in lines)]
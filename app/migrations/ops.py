@@ -0,0 +1,23 @@
+"""
+Building blocks shared by migrations in app/migrations/versions.
+"""
+import logging
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VALID = text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)")
+
+
+async def create_index_concurrently(conn, name: str, target: str):
+    """
+    CREATE INDEX CONCURRENTLY that recovers from an earlier failed build. A
+    failed or cancelled concurrent build leaves an INVALID index behind, and
+    IF NOT EXISTS alone would keep it; drop it and build again.
+    Needs an autocommit connection (transactional = False).
+    """
+    valid = (await conn.execute(_INDEX_VALID, {"name": name})).scalar_one_or_none()
+    if valid is False:
+        logger.warning(f"⚠️ Index {name} is INVALID from an earlier build, rebuilding")
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}"))
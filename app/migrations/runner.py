@@ -0,0 +1,108 @@
+import importlib
+import logging
+import pkgutil
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.migrations import versions
+
+logger = logging.getLogger(__name__)
+
+# Serialises concurrent upgrades (several containers booting at once)
+MIGRATION_LOCK_KEY = 724138
+
+_CREATE_TABLE = text(
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        revision VARCHAR PRIMARY KEY,
+        description VARCHAR NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """
+)
+_RECORD = text("INSERT INTO schema_migrations (revision, description) VALUES (:revision, :description)")
+
+
+@dataclass(frozen=True)
+class Migration:
+    revision: str
+    description: str
+    upgrade: Callable[..., Awaitable[None]]
+    transactional: bool = True
+
+
+def discover() -> list[Migration]:
+    """All migrations in app/migrations/versions, ordered by revision."""
+    found = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        found.append(
+            Migration(
+                revision=module.revision,
+                description=module.description,
+                upgrade=module.upgrade,
+                transactional=getattr(module, "transactional", True),
+            )
+        )
+    found.sort(key=lambda m: m.revision)
+
+    revisions = [m.revision for m in found]
+    if len(set(revisions)) != len(revisions):
+        raise RuntimeError(f"Duplicate migration revisions: {revisions}")
+    return found
+
+
+async def _applied(engine: AsyncEngine) -> set[str]:
+    async with engine.begin() as conn:
+        await conn.execute(_CREATE_TABLE)
+        result = await conn.execute(text("SELECT revision FROM schema_migrations"))
+        return set(result.scalars().all())
+
+
+async def _apply(engine: AsyncEngine, migration: Migration):
+    if migration.transactional:
+        async with engine.begin() as conn:
+            await migration.upgrade(conn)
+            await conn.execute(_RECORD, {"revision": migration.revision, "description": migration.description})
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await migration.upgrade(conn)
+        await conn.execute(_RECORD, {"revision": migration.revision, "description": migration.description})
+
+
+async def upgrade(engine: AsyncEngine | None = None) -> list[str]:
+    """Apply every pending migration in order. Returns the revisions applied."""
+    if engine is None:
+        from app.database import engine
+
+    applied_now = []
+    async with engine.connect() as lock_conn:
+        # Session-level lock on an autocommit connection: no open transaction
+        # for CREATE INDEX CONCURRENTLY to wait on
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            applied = await _applied(engine)
+            for migration in discover():
+                if migration.revision in applied:
+                    continue
+                logger.info(f"⬆️ Applying migration {migration.revision}: {migration.description}")
+                await _apply(engine, migration)
+                applied_now.append(migration.revision)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+    logger.info(f"✅ Schema up to date ({len(applied_now)} migration(s) applied)")
+    return applied_now
+
+
+async def status(engine: AsyncEngine | None = None) -> list[tuple[Migration, bool]]:
+    if engine is None:
+        from app.database import engine
+
+    applied = await _applied(engine)
+    return [(m, m.revision in applied) for m in discover()]
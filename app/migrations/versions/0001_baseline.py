@@ -0,0 +1,219 @@
+"""
+Baseline: the schema production already had, as startup used to create it
+with create_all before any of the later tables, columns and indexes. On an
+existing database every statement is a no-op; later migrations bring it up
+to date. Only indexes on baseline columns belong here: hot-path indexes on
+populated tables are built CONCURRENTLY in 0003.
+"""
+from sqlalchemy import text
+
+revision = "0001"
+description = "baseline tables"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS articles (
+        id UUID NOT NULL,
+        slug VARCHAR NOT NULL,
+        title VARCHAR NOT NULL,
+        excerpt TEXT,
+        read_count INTEGER,
+        save_count INTEGER,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_articles_slug ON articles (slug)",
+    """
+    CREATE TABLE IF NOT EXISTS behavioral_nudges (
+        id UUID NOT NULL,
+        title VARCHAR,
+        paragraphs JSON NOT NULL,
+        quote TEXT,
+        link VARCHAR,
+        is_active BOOLEAN,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS microchallenge_definitions (
+        id UUID NOT NULL,
+        title TEXT NOT NULL,
+        intro JSON NOT NULL,
+        instructions JSON NOT NULL,
+        why TEXT NOT NULL,
+        tips JSON NOT NULL,
+        closing TEXT NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS newsletter_subscribers (
+        id UUID NOT NULL,
+        email VARCHAR NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_newsletter_subscribers_email ON newsletter_subscribers (email)",
+    """
+    CREATE TABLE IF NOT EXISTS participants (
+        id UUID NOT NULL,
+        email VARCHAR NOT NULL,
+        phone_number VARCHAR,
+        cohort VARCHAR,
+        joined_on TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_participants_email ON participants (email)",
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id UUID NOT NULL,
+        email VARCHAR NOT NULL,
+        password_hash VARCHAR,
+        google_id VARCHAR,
+        name VARCHAR,
+        phone_number VARCHAR,
+        whatsapp_opt_in BOOLEAN,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        UNIQUE (google_id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_phone_number ON users (phone_number)",
+    """
+    CREATE TABLE IF NOT EXISTS waitlist (
+        id UUID NOT NULL,
+        email VARCHAR,
+        name VARCHAR,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_waitlist_email ON waitlist (email)",
+    """
+    CREATE TABLE IF NOT EXISTS ikea_worksheet (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        status VARCHAR,
+        struggle TEXT NOT NULL,
+        identity TEXT NOT NULL,
+        knowledge TEXT NOT NULL,
+        environment JSON NOT NULL,
+        tiny_action TEXT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS saved_articles (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        article_id UUID NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_user_article UNIQUE (user_id, article_id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(article_id) REFERENCES articles (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS spots (
+        id UUID NOT NULL,
+        user_id UUID,
+        description TEXT,
+        date DATE,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_microchallenges (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        challenge_id UUID NOT NULL,
+        status VARCHAR,
+        started_at TIMESTAMP WITHOUT TIME ZONE,
+        completed_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(challenge_id) REFERENCES microchallenge_definitions (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_preferences (
+        id UUID NOT NULL,
+        user_id UUID,
+        nudge_enabled BOOLEAN,
+        microchallenge_enabled BOOLEAN,
+        notif_channel VARCHAR,
+        whatsapp_number VARCHAR,
+        whatsapp_verified BOOLEAN,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        UNIQUE (user_id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS web_push_subscriptions (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        endpoint TEXT NOT NULL,
+        keys JSON NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        UNIQUE (endpoint)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS weekly_reflections (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        content TEXT NOT NULL,
+        week_start DATE NOT NULL,
+        week_end DATE NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ikea_tracker (
+        id UUID NOT NULL,
+        worksheet_id UUID NOT NULL,
+        date DATE NOT NULL,
+        completed BOOLEAN NOT NULL,
+        note TEXT,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_worksheet_date UNIQUE (worksheet_id, date),
+        FOREIGN KEY(worksheet_id) REFERENCES ikea_worksheet (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS microchallenge_logs (
+        id UUID NOT NULL,
+        assignment_id UUID NOT NULL,
+        log_date DATE NOT NULL,
+        note TEXT,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_assignment_log_date UNIQUE (assignment_id, log_date),
+        FOREIGN KEY(assignment_id) REFERENCES user_microchallenges (id)
+    )
+    """,
+]
+
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
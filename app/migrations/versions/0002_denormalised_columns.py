@@ -0,0 +1,64 @@
+"""
+Tables and columns added after the baseline: the notification outbox, the
+per-day article read totals, user_preferences.timezone and the microchallenge
+log counters (backfilled from microchallenge_logs). The tables start empty,
+so their indexes are built inline.
+"""
+from sqlalchemy import text
+
+revision = "0002"
+description = "outbox, daily reads, timezone and microchallenge log counters"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS notification_outbox (
+        id UUID NOT NULL,
+        idempotency_key VARCHAR NOT NULL,
+        job_run VARCHAR NOT NULL,
+        user_id UUID NOT NULL,
+        channel VARCHAR NOT NULL,
+        payload JSON NOT NULL,
+        status VARCHAR,
+        attempts INTEGER,
+        last_error TEXT,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        UNIQUE (idempotency_key),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_notification_outbox_job_run ON notification_outbox (job_run)",
+    "CREATE INDEX IF NOT EXISTS ix_notification_outbox_status_created ON notification_outbox (status, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS article_daily_reads (
+        id UUID NOT NULL,
+        article_id UUID NOT NULL,
+        day DATE NOT NULL,
+        read_count INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_article_day UNIQUE (article_id, day),
+        FOREIGN KEY(article_id) REFERENCES articles (id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_article_daily_reads_day ON article_daily_reads (day)",
+    "ALTER TABLE user_preferences ADD COLUMN IF NOT EXISTS timezone VARCHAR",
+    "ALTER TABLE user_microchallenges ADD COLUMN IF NOT EXISTS log_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE user_microchallenges ADD COLUMN IF NOT EXISTS last_log_date DATE",
+    """
+    UPDATE user_microchallenges AS um
+    SET log_count = t.log_count, last_log_date = t.last_log_date
+    FROM (
+        SELECT assignment_id, count(*) AS log_count, max(log_date) AS last_log_date
+        FROM microchallenge_logs
+        GROUP BY assignment_id
+    ) t
+    WHERE um.id = t.assignment_id
+      AND (um.log_count <> t.log_count OR um.last_log_date IS DISTINCT FROM t.last_log_date)
+    """,
+]
+
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
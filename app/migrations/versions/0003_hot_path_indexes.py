@@ -0,0 +1,27 @@
+"""
+Indexes for the per-user hot paths (list pages, "done today" checks,
+reminder fan-out). Built CONCURRENTLY so writes keep flowing, after 0002
+has added the columns some of them cover. This is the only place they are
+created, on fresh and existing databases alike.
+"""
+from app.migrations.ops import create_index_concurrently
+
+revision = "0003"
+description = "hot-path indexes"
+transactional = False
+
+INDEXES = {
+    "ix_spots_user_date": "spots (user_id, date, id)",
+    "ix_user_microchallenges_user_status": "user_microchallenges (user_id, status)",
+    "ix_user_microchallenges_user_started": "user_microchallenges (user_id, started_at, id)",
+    "ix_user_microchallenges_user_last_log": "user_microchallenges (user_id, last_log_date)",
+    "ix_web_push_subscriptions_user": "web_push_subscriptions (user_id)",
+    "ix_ikea_worksheet_user_status_created": "ikea_worksheet (user_id, status, created_at, id)",
+    "ix_weekly_reflections_user_created": "weekly_reflections (user_id, created_at)",
+    "ix_saved_articles_user_created": "saved_articles (user_id, created_at, id)",
+}
+
+
+async def upgrade(conn):
+    for name, target in INDEXES.items():
+        await create_index_concurrently(conn, name, target)
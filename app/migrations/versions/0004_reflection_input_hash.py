@@ -0,0 +1,19 @@
+"""
+weekly_reflections.input_hash, used to return a stored reflection when the
+week's inputs have not changed since it was generated.
+"""
+from sqlalchemy import text
+from app.migrations.ops import create_index_concurrently
+
+revision = "0004"
+description = "weekly reflection input hash"
+transactional = False
+
+
+async def upgrade(conn):
+    await conn.execute(text("ALTER TABLE weekly_reflections ADD COLUMN IF NOT EXISTS input_hash VARCHAR(64)"))
+    await create_index_concurrently(
+        conn,
+        "ix_weekly_reflections_user_week_hash",
+        "weekly_reflections (user_id, week_start, input_hash)",
+    )
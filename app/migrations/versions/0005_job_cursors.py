@@ -0,0 +1,22 @@
+"""
+job_cursors: resume points for batch jobs (weekly reflection pre-generation).
+"""
+from sqlalchemy import text
+
+revision = "0005"
+description = "job cursors"
+
+
+async def upgrade(conn):
+    await conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS job_cursors (
+                name VARCHAR NOT NULL,
+                position VARCHAR,
+                updated_at TIMESTAMP WITHOUT TIME ZONE,
+                PRIMARY KEY (name)
+            )
+            """
+        )
+    )
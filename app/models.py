@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Date, JSON, UniqueConstraint, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Date, JSON, UniqueConstraint, Integer, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -28,6 +28,7 @@ class UserPreferences(Base):
     notif_channel = Column(String, default="push")   # push | whatsapp | both
     whatsapp_number = Column(String, nullable=True)
     whatsapp_verified = Column(Boolean, default=False)
+    timezone = Column(String, nullable=True)          # IANA name, e.g. "Europe/London"; NULL = DEFAULT_TIMEZONE
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -42,6 +43,10 @@ class CavemanSpot(Base):
     date = Column(Date)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_spots_user_date", "user_id", "date", "id"),
+    )
+
 class Waitlist(Base):
     __tablename__ = "waitlist"
 
@@ -87,9 +92,19 @@ class UserMicrochallenge(Base):
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
 
+    # Denormalised from microchallenge_logs; kept in step by POST /challenges/log
+    log_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_log_date = Column(Date, nullable=True)
+
     challenge = relationship("MicrochallengeDefinition", back_populates="user_challenges")
     logs = relationship("MicrochallengeLog", back_populates="assignment")
 
+    __table_args__ = (
+        Index("ix_user_microchallenges_user_last_log", "user_id", "last_log_date"),
+        Index("ix_user_microchallenges_user_status", "user_id", "status"),
+        Index("ix_user_microchallenges_user_started", "user_id", "started_at", "id"),
+    )
+
 
 class MicrochallengeLog(Base):
     __tablename__ = "microchallenge_logs"
@@ -116,6 +131,10 @@ class WebPushSubscription(Base):
     keys = Column(JSON, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_web_push_subscriptions_user", "user_id"),
+    )
+
 class IkeaWorksheet(Base):
     __tablename__ = "ikea_worksheet"
 
@@ -132,6 +151,10 @@ class IkeaWorksheet(Base):
     user = relationship("User", backref="ikea_worksheets")
     tracker_entries = relationship("IkeaTracker", back_populates="worksheet", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_ikea_worksheet_user_status_created", "user_id", "status", "created_at", "id"),
+    )
+
 
 class IkeaTracker(Base):
     __tablename__ = "ikea_tracker"
@@ -169,6 +192,12 @@ class WeeklyReflection(Base):
     week_start = Column(Date, nullable=False)
     week_end = Column(Date, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    input_hash = Column(String(64), nullable=True)  # sha256 of the prompt inputs; same hash = same reflection
+
+    __table_args__ = (
+        Index("ix_weekly_reflections_user_created", "user_id", "created_at"),
+        Index("ix_weekly_reflections_user_week_hash", "user_id", "week_start", "input_hash"),
+    )
 
 
 class NewsletterSubscriber(Base):
@@ -193,6 +222,18 @@ class Article(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+class ArticleDailyRead(Base):
+    __tablename__ = "article_daily_reads"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False, index=True)     # UTC day
+    read_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("article_id", "day", name="uq_article_day"),
+    )
+
 class SavedArticle(Base):
     __tablename__ = "saved_articles"
 
@@ -203,4 +244,34 @@ class SavedArticle(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "article_id", name="uq_user_article"),
+        Index("ix_saved_articles_user_created", "user_id", "created_at", "id"),
     )
+
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    idempotency_key = Column(String, unique=True, nullable=False)   # job_run:user_id:channel
+    job_run = Column(String, nullable=False, index=True)            # e.g. "spot_push:2025-01-31"
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    channel = Column(String, nullable=False)                        # push | whatsapp
+    payload = Column(JSON, nullable=False)
+    status = Column(String, default="pending")                      # pending / delivered / failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_created", "status", "created_at"),
+    )
+
+
+class JobCursor(Base):
+    __tablename__ = "job_cursors"
+
+    # Resume point for long-running batch jobs, one row per job
+    name = Column(String, primary_key=True)
+    position = Column(String, nullable=True)                        # job-defined, e.g. "2025-01-06:<last user id>"
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -5,12 +5,30 @@ from fastapi import Depends, HTTPException, status, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.config import settings
 from app.database import get_db
 from app.models import User
+from app.utils.cache import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import hashlib
 import os
+import time
+import uuid
 from typing import Optional
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min == max == default, so hashes made with any other cost get flagged for rehash
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small dedicated pool keeps it off the event loop
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
 
 # ------------------------
 # Config
@@ -43,6 +61,18 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify off the event loop. Returns (valid, new_hash); new_hash is set when
+    the stored hash uses an outdated cost and should be replaced.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.verify_and_update, plain, hashed)
+
 # ------------------------
 # JWT handling
 # ------------------------
@@ -57,12 +87,31 @@ def create_refresh_token(user_id: str) -> str:
     to_encode = {"sub": user_id, "exp": expire, "typ": "refresh"}
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Verified claims keyed by sha256(token), so repeat requests skip HS256 + parsing
+_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_MAX_TTL)
+
+def verify_token(token: str) -> dict:
+    """Decode and verify a JWT, serving repeat tokens from the cache. Raises JWTError."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    claims = _token_cache.get(key)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    exp = claims.get("exp")
+    # Never serve a token past its exp claim
+    _token_cache.set(key, claims, ttl=exp - time.time() if exp else None)
+    return claims
+
 def decode_token(token: str):
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return dict(verify_token(token))
     except JWTError:
         return None
 
+def auth_cache_stats() -> dict:
+    return {"tokens": _token_cache.stats(), "users": _user_cache.stats()}
+
 # ------------------------
 # Cookie helpers
 # ------------------------
@@ -110,20 +159,32 @@ def clear_auth_cookies(resp: Response):
 def get_token_from_cookies(req: Request) -> Optional[str]:
     return req.cookies.get("access_token")
 
+# ------------------------
+# Authenticated-user cache
+# ------------------------
+@dataclass(frozen=True)
+class CurrentUser:
+    """Lightweight principal handed to routes instead of the ORM User row."""
+    id: uuid.UUID
+    email: str
+    name: Optional[str] = None
+
+
+_user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+def invalidate_user(user_id):
+    """Drop a cached principal after the user (or their preferences) changed."""
+    _user_cache.pop(str(user_id))
+
+
 # ------------------------
 # Security dependency
 # ------------------------
 security = HTTPBearer(auto_error=False)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    req: Request = None,
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """
-    Extract the current user either from Bearer token OR HttpOnly cookie.
-    """
 
+def _get_request_token(credentials: HTTPAuthorizationCredentials, req: Request) -> str:
     token = None
 
     # 1) Prefer Authorization header
@@ -138,23 +199,61 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
         )
+    return token
+
 
+def _get_token_user_id(token: str) -> str:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
+        payload = verify_token(token)
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+
+    user_id: str = payload.get("sub")
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return user_id
 
-        if not user_id:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    req: Request = None,
+) -> uuid.UUID:
+    """
+    Only verify the token and return its user id. Never touches the DB, so
+    use it where the route filters by user_id anyway.
+    """
+    user_id = _get_token_user_id(_get_request_token(credentials, req))
+    try:
+        return uuid.UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    req: Request = None,
+    db: AsyncSession = Depends(get_db),
+) -> CurrentUser:
+    """
+    Extract the current user either from Bearer token OR HttpOnly cookie.
+    Recently seen users are served from an in-process cache.
+    """
+    user_id = _get_token_user_id(_get_request_token(credentials, req))
+
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    try:
         # Fetch user from DB
         result = await db.execute(select(User).where(User.id == user_id))
         user = result.scalar_one_or_none()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-
-        return user
-
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed")
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    principal = CurrentUser(id=user.id, email=user.email, name=user.name)
+    _user_cache.set(user_id, principal)
+    return principal
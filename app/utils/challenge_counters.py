@@ -0,0 +1,97 @@
+"""
+Keep user_microchallenges.log_count / last_log_date in step with
+microchallenge_logs.
+
+    python -m app.utils.challenge_counters    # backfill / repair drift
+"""
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import MicrochallengeLog, UserMicrochallenge
+
+logger = logging.getLogger(__name__)
+
+
+def log_and_count_stmt(assignment_id, log_date: date, note: str):
+    """
+    One statement: insert the log (skipped if that day is already logged) and,
+    only if it was inserted, bump the assignment's counters. Returns the new
+    log_count, or no row when the day was already logged.
+    """
+    new_log = (
+        pg_insert(MicrochallengeLog)
+        .values(
+            id=uuid.uuid4(),
+            assignment_id=assignment_id,
+            log_date=log_date,
+            note=note,
+            created_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(constraint="uq_assignment_log_date")
+        .returning(MicrochallengeLog.assignment_id, MicrochallengeLog.log_date)
+        .cte("new_log")
+    )
+    return (
+        update(UserMicrochallenge)
+        .where(UserMicrochallenge.id == new_log.c.assignment_id)
+        .values(
+            log_count=UserMicrochallenge.log_count + 1,
+            last_log_date=func.greatest(UserMicrochallenge.last_log_date, new_log.c.log_date),
+        )
+        .returning(UserMicrochallenge.log_count)
+        .add_cte(new_log)
+    )
+
+
+async def repair_log_counters(db: AsyncSession) -> int:
+    """Recompute counters from the logs table, touching only rows that drifted."""
+    totals = (
+        select(
+            MicrochallengeLog.assignment_id.label("assignment_id"),
+            func.count(MicrochallengeLog.id).label("log_count"),
+            func.max(MicrochallengeLog.log_date).label("last_log_date"),
+        )
+        .group_by(MicrochallengeLog.assignment_id)
+        .subquery()
+    )
+    fixed = await db.execute(
+        update(UserMicrochallenge)
+        .where(
+            UserMicrochallenge.id == totals.c.assignment_id,
+            (UserMicrochallenge.log_count != totals.c.log_count)
+            | UserMicrochallenge.last_log_date.is_distinct_from(totals.c.last_log_date),
+        )
+        .values(log_count=totals.c.log_count, last_log_date=totals.c.last_log_date)
+    )
+
+    # Assignments whose logs are all gone
+    no_logs = await db.execute(
+        update(UserMicrochallenge)
+        .where(
+            ~select(MicrochallengeLog.id).where(MicrochallengeLog.assignment_id == UserMicrochallenge.id).exists(),
+            (UserMicrochallenge.log_count != 0) | UserMicrochallenge.last_log_date.isnot(None),
+        )
+        .values(log_count=0, last_log_date=None)
+    )
+    await db.commit()
+
+    repaired = (fixed.rowcount or 0) + (no_logs.rowcount or 0)
+    logger.info(f"🔧 Repaired log counters on {repaired} assignment(s)")
+    return repaired
+
+
+async def main():
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        await repair_log_counters(db)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
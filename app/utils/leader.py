@@ -0,0 +1,84 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+import asyncio
+import logging
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger("apscheduler")
+
+# Session-level advisory locks live as long as the connection that took them,
+# so the leader keeps one dedicated connection open. If the process dies the
+# connection drops, Postgres frees the lock and another process takes over.
+_conn: AsyncConnection | None = None
+_is_leader = False
+# The heartbeat and a firing cron job may both check at once; only one may touch _conn
+_check_lock = asyncio.Lock()
+
+
+def is_leader() -> bool:
+    return _is_leader
+
+
+async def _drop_connection(unlock: bool):
+    global _conn, _is_leader
+    conn, _conn, _is_leader = _conn, None, False
+    if conn is None:
+        return
+    try:
+        if unlock:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": settings.SCHEDULER_LOCK_KEY})
+            await conn.commit()
+        await conn.close()
+    except Exception:
+        # Never hand a connection that may still hold the lock back to the pool
+        await conn.invalidate()
+
+
+async def ensure_leadership() -> bool:
+    """
+    Heartbeat: confirm the lock is still held, or try to take it.
+    Called periodically on every process and whenever a cron job fires;
+    only one process can hold the lock.
+    """
+    async with _check_lock:
+        return await _ensure_leadership()
+
+
+async def _ensure_leadership() -> bool:
+    global _conn, _is_leader
+
+    if _is_leader:
+        try:
+            await _conn.execute(text("SELECT 1"))
+            await _conn.commit()
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Lost scheduler leadership: {e}")
+            await _drop_connection(unlock=False)
+
+    try:
+        _conn = await engine.connect()
+        result = await _conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": settings.SCHEDULER_LOCK_KEY}
+        )
+        acquired = bool(result.scalar())
+        await _conn.commit()  # the lock outlives the transaction; don't sit idle in one
+    except Exception as e:
+        logger.warning(f"⚠️ Leader election failed: {e}")
+        await _drop_connection(unlock=False)
+        return False
+
+    if acquired:
+        _is_leader = True
+        logger.info("👑 This process is now the scheduler leader")
+    else:
+        await _conn.close()
+        _conn = None
+    return _is_leader
+
+
+async def release_leadership():
+    if _conn is not None:
+        await _drop_connection(unlock=_is_leader)
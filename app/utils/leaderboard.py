@@ -0,0 +1,80 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Article, ArticleDailyRead
+
+MAX_LIMIT = 20
+WINDOWS = {"all": None, "week": 7, "month": 30}  # window name -> days (None = all-time counter)
+
+
+def serialize_article(a: Article, reads: int | None = None) -> dict:
+    entry = {
+        "slug": a.slug,
+        "title": a.title,
+        "excerpt": a.excerpt,
+        "read_count": a.read_count,
+        "save_count": a.save_count,
+    }
+    if reads is not None:
+        entry["window_reads"] = int(reads)
+    return entry
+
+
+class Leaderboard:
+    """
+    Top MAX_LIMIT articles per window, rebuilt at most every LEADERBOARD_TTL
+    seconds and served from memory; reads flushed meanwhile show up on the
+    next rebuild.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._boards: dict[str, list[dict]] = {}
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._built_at = 0.0
+
+    def _is_fresh(self) -> bool:
+        return bool(self._boards) and time.monotonic() - self._built_at < self.ttl
+
+    async def rebuild(self, db: AsyncSession):
+        async with self._lock:
+            if self._is_fresh():
+                return
+            boards = {}
+            result = await db.execute(
+                select(Article).order_by(Article.read_count.desc()).limit(MAX_LIMIT)
+            )
+            boards["all"] = [serialize_article(a) for a in result.scalars().all()]
+
+            today = datetime.utcnow().date()
+            for window, days in WINDOWS.items():
+                if days is None:
+                    continue
+                reads = func.sum(ArticleDailyRead.read_count).label("reads")
+                result = await db.execute(
+                    select(Article, reads)
+                    .join(ArticleDailyRead, ArticleDailyRead.article_id == Article.id)
+                    .where(ArticleDailyRead.day > today - timedelta(days=days))
+                    .group_by(Article.id)
+                    .order_by(reads.desc())
+                    .limit(MAX_LIMIT)
+                )
+                boards[window] = [serialize_article(a, n) for a, n in result.all()]
+
+            self._boards = boards
+            self._built_at = time.monotonic()
+
+    async def top(self, db: AsyncSession, limit: int = 3, window: str = "all") -> list[dict]:
+        if not self._is_fresh():
+            await self.rebuild(db)
+        return self._boards.get(window, [])[:limit]
+
+
+leaderboard = Leaderboard(ttl=settings.LEADERBOARD_TTL)
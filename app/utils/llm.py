@@ -0,0 +1,29 @@
+import os
+from app.config import settings
+
+_client = None
+
+
+def get_openai_client():
+    """
+    Async OpenAI client shared by every request (one connection pool per
+    worker), created on first use so importing the app never touches the SDK
+    or requires the key.
+    """
+    global _client
+    if _client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OpenAI API key not set. Please define OPENAI_API_KEY in environment.")
+
+        import openai
+
+        _client = openai.AsyncOpenAI(api_key=api_key, timeout=settings.OPENAI_TIMEOUT)
+    return _client
+
+
+async def close_openai_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
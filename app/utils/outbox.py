@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import NotificationOutbox, WebPushSubscription
+from app.utils.pushnotification import send_push_batch
+from app.utils.whatsapp import send_many
+
+logger = logging.getLogger(__name__)
+
+ENQUEUE_CHUNK_SIZE = 1000  # keeps each INSERT well under the bind-parameter limit
+
+
+def make_idempotency_key(job_run: str, user_id, channel: str) -> str:
+    return f"{job_run}:{user_id}:{channel}"
+
+
+async def enqueue(db: AsyncSession, job_run: str, messages: list[dict]) -> int:
+    """
+    Write one outbox row per message ({user_id, channel, payload}) for this run.
+    A message may carry its own "job_run" (e.g. per user local date).
+    Rows already enqueued for the same (job_run, user, channel) are skipped, so
+    re-running a job never duplicates deliveries. All chunks commit together.
+    """
+    inserted = 0
+    rows = [
+        {
+            "idempotency_key": make_idempotency_key(m.get("job_run", job_run), m["user_id"], m["channel"]),
+            "job_run": m.get("job_run", job_run),
+            "user_id": m["user_id"],
+            "channel": m["channel"],
+            "payload": m["payload"],
+            "status": "pending",
+            "attempts": 0,
+        }
+        for m in messages
+    ]
+
+    for start in range(0, len(rows), ENQUEUE_CHUNK_SIZE):
+        stmt = (
+            pg_insert(NotificationOutbox)
+            .values(rows[start:start + ENQUEUE_CHUNK_SIZE])
+            .on_conflict_do_nothing(index_elements=["idempotency_key"])
+        )
+        result = await db.execute(stmt)
+        inserted += result.rowcount or 0
+
+    await db.commit()
+    logger.info(f"📥 Enqueued {inserted} new outbox rows for '{job_run}' ({len(rows)} requested)")
+    return inserted
+
+
+def _mark(row: NotificationOutbox, ok: bool, error: str | None = None):
+    row.status = "delivered" if ok else "failed"
+    row.attempts = (row.attempts or 0) + 1
+    row.last_error = None if ok else error
+    row.updated_at = datetime.utcnow()
+
+
+async def _deliver_push(db: AsyncSession, rows: list[NotificationOutbox]):
+    user_ids = {row.user_id for row in rows}
+    result = await db.execute(
+        select(WebPushSubscription).where(WebPushSubscription.user_id.in_(user_ids))
+    )
+    devices: dict = {}
+    for sub in result.scalars().all():
+        devices.setdefault(sub.user_id, []).append(sub)
+
+    # One concurrent batch per distinct payload
+    by_payload: dict = {}
+    for row in rows:
+        by_payload.setdefault(json.dumps(row.payload, sort_keys=True), []).append(row)
+
+    expired_ids = []
+    for payload, payload_rows in by_payload.items():
+        subs = [sub for row in payload_rows for sub in devices.get(row.user_id, [])]
+        # No session here: committing would release the row locks mid-batch
+        results = await send_push_batch(subs, payload)
+        delivered = {r.sub_id for r in results if r.ok}
+        expired_ids.extend(r.sub_id for r in results if r.expired)
+
+        for row in payload_rows:
+            user_subs = devices.get(row.user_id, [])
+            if not user_subs:
+                _mark(row, False, "no push subscriptions")
+            else:
+                _mark(row, any(sub.id in delivered for sub in user_subs), "all devices failed")
+
+    if expired_ids:
+        await db.execute(delete(WebPushSubscription).where(WebPushSubscription.id.in_(expired_ids)))
+
+
+async def _deliver_whatsapp(rows: list[NotificationOutbox]):
+    results = await send_many((row.payload["to"], row.payload["message"]) for row in rows)
+    for row, result in zip(rows, results):
+        _mark(row, result.ok, result.error)
+
+
+async def drain_once(db: AsyncSession, job_run: str | None = None, batch_size: int | None = None) -> dict:
+    """
+    Claim up to `batch_size` pending rows with FOR UPDATE SKIP LOCKED, send
+    them and record the outcome in the same transaction. Concurrent workers
+    (in this or other processes) skip rows that are already claimed.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=settings.OUTBOX_MAX_AGE_HOURS)
+    stmt = (
+        select(NotificationOutbox)
+        .where(NotificationOutbox.status == "pending", NotificationOutbox.created_at >= cutoff)
+        .order_by(NotificationOutbox.created_at)
+        .limit(batch_size or settings.OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    if job_run:
+        stmt = stmt.where(NotificationOutbox.job_run == job_run)
+
+    result = await db.execute(stmt)
+    rows = result.scalars().all()
+    if not rows:
+        await db.rollback()
+        return {"claimed": 0, "delivered": {}, "failed": {}}
+
+    push_rows = [r for r in rows if r.channel == "push"]
+    whatsapp_rows = [r for r in rows if r.channel == "whatsapp"]
+    for row in rows:
+        if row.channel not in ("push", "whatsapp"):
+            _mark(row, False, f"unknown channel {row.channel}")
+
+    sends = []
+    if push_rows:
+        sends.append(_deliver_push(db, push_rows))
+    if whatsapp_rows:
+        sends.append(_deliver_whatsapp(whatsapp_rows))
+    await asyncio.gather(*sends)
+
+    await db.commit()
+
+    counts = {"claimed": len(rows), "delivered": {}, "failed": {}}
+    for row in rows:
+        bucket = counts["delivered"] if row.status == "delivered" else counts["failed"]
+        bucket[row.channel] = bucket.get(row.channel, 0) + 1
+    return counts
+
+
+async def drain(job_run: str | None = None, workers: int | None = None) -> dict:
+    """
+    Drain the outbox with a pool of workers, each on its own session, until
+    no claimable rows are left. Returns delivered/failed totals per channel.
+    """
+    totals = {"delivered": {}, "failed": {}}
+
+    async def worker():
+        async with AsyncSessionLocal() as db:
+            while True:
+                counts = await drain_once(db, job_run)
+                if not counts["claimed"]:
+                    return
+                for outcome in ("delivered", "failed"):
+                    for channel, n in counts[outcome].items():
+                        totals[outcome][channel] = totals[outcome].get(channel, 0) + n
+
+    await asyncio.gather(*(worker() for _ in range(workers or settings.OUTBOX_WORKERS)))
+    logger.info(f"📤 Outbox drained for '{job_run or 'all'}': {totals}")
+    return totals
+
+
+async def expire_stale(db: AsyncSession) -> int:
+    """Fail pending rows too old to be worth sending (e.g. a 9 AM nudge at night)."""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.OUTBOX_MAX_AGE_HOURS)
+    result = await db.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.status == "pending", NotificationOutbox.created_at < cutoff)
+        .values(status="failed", last_error="expired", updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    return result.rowcount or 0
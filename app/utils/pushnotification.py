@@ -1,45 +1,186 @@
-from pywebpush import webpush, WebPushException
 from app.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import delete
 from app.models import WebPushSubscription
+from dataclasses import dataclass
+from urllib.parse import urlparse
+import asyncio
+import httpx
 import logging
-import json
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from py_vapid import Vapid
 
 logger = logging.getLogger(__name__)
 
-async def send_push(subscription: dict, payload: str, db: AsyncSession, sub_id=None):
+VAPID_EXPIRY_SECONDS = 12 * 60 * 60  # same lifetime pywebpush uses
+VAPID_REFRESH_MARGIN_SECONDS = 10 * 60  # re-sign this long before exp
+
+# Shared client so every push reuses pooled keep-alive connections
+_client: httpx.AsyncClient | None = None
+
+# Parsed signing key and signed headers per push-service origin: {aud: (headers, exp)}
+_vapid: "tuple[str, Vapid] | None" = None
+_vapid_headers_cache: dict[str, tuple[dict, int]] = {}
+
+
+@dataclass
+class PushResult:
+    endpoint: str
+    sub_id: object = None
+    status_code: int | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code is not None and self.status_code <= 202
+
+    @property
+    def expired(self) -> bool:
+        return self.status_code in (404, 410)  # not found / gone
+
+
+def get_push_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.PUSH_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.PUSH_CONCURRENCY,
+                max_keepalive_connections=settings.PUSH_CONCURRENCY,
+            ),
+        )
+    return _client
+
+
+async def close_push_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _vapid_signer() -> "Vapid":
+    global _vapid
+    if _vapid is None or _vapid[0] != settings.VAPID_PRIVATE_KEY:
+        from py_vapid import Vapid  # imported on first push; pywebpush/py_vapid are slow to import
+
+        _vapid = (settings.VAPID_PRIVATE_KEY, Vapid.from_string(private_key=settings.VAPID_PRIVATE_KEY))
+        _vapid_headers_cache.clear()
+    return _vapid[1]
+
+
+def _vapid_headers(endpoint: str) -> dict:
+    """
+    Signed VAPID headers for the endpoint's push service. The JWT only depends
+    on the audience origin, so one signature is shared by every subscription
+    on that service until shortly before it expires.
+    """
+    url = urlparse(endpoint)
+    aud = f"{url.scheme}://{url.netloc}"
+    signer = _vapid_signer()
+    now = time.time()
+
+    cached = _vapid_headers_cache.get(aud)
+    if cached and cached[1] - VAPID_REFRESH_MARGIN_SECONDS > now:
+        return cached[0]
+
+    exp = int(now) + VAPID_EXPIRY_SECONDS
+    headers = signer.sign({
+        "sub": f"mailto:{settings.VAPID_CLAIMS_EMAIL}",
+        "aud": aud,
+        "exp": exp,
+    })
+    _vapid_headers_cache[aud] = (headers, exp)
+    return headers
+
+
+def _encrypt(subscription: dict, payload: str) -> tuple[bytes, dict]:
+    """Encrypt the payload for one subscription and build its request headers."""
+    from pywebpush import WebPusher
+
+    encoded = WebPusher(subscription).encode(payload.encode(), "aes128gcm")
+    headers = {
+        "content-encoding": "aes128gcm",
+        "ttl": str(settings.PUSH_TTL),
+    }
+    headers.update(_vapid_headers(subscription["endpoint"]))
+    return encoded["body"], headers
+
+
+async def _deliver(subscription: dict, payload: str, sub_id=None) -> PushResult:
+    endpoint = subscription.get("endpoint")
+    result = PushResult(endpoint=endpoint, sub_id=sub_id)
+
+    try:
+        body, headers = _encrypt(subscription, payload)
+        response = await get_push_client().post(endpoint, content=body, headers=headers)
+        result.status_code = response.status_code
+    except Exception as ex:
+        logger.error(f"WebPush request to {endpoint} failed: {ex}")
+        result.error = str(ex)
+        return result
+
+    if result.ok:
+        return result
+
+    status_code = result.status_code
+    result.error = f"status {status_code}"
+    logger.error(f"WebPush failed for {endpoint} (status {status_code})")
+
+    if result.expired:
+        logger.warning(f"Subscription {sub_id} expired")
+    elif status_code == 400:
+        logger.warning("Push request malformed (400).")
+    elif status_code == 401:
+        logger.error("Push authentication failed (401).")
+    else:
+        logger.error("Unhandled WebPush error.")
+
+    return result
+
+
+async def _delete_expired(results: list[PushResult], db: AsyncSession | None):
+    # ❌ Remove expired/invalid subscriptions from DB
+    expired_ids = [r.sub_id for r in results if r.expired and r.sub_id]
+    if not expired_ids or db is None:
+        return
+    logger.warning(f"Deleting {len(expired_ids)} expired subscription(s)")
+    await db.execute(delete(WebPushSubscription).where(WebPushSubscription.id.in_(expired_ids)))
+    await db.commit()
+
+
+async def send_push(subscription: dict, payload: str, db: AsyncSession | None = None, sub_id=None) -> PushResult:
     """
     subscription: dict with {endpoint, keys}
     payload: str (JSON payload to send)
-    db: AsyncSession (so we can delete expired subs)
+    db: optional AsyncSession (so we can delete expired subs)
     sub_id: optional UUID of the subscription row (to delete if expired)
     """
-    try:
-        response = webpush(
-            subscription_info=subscription,
-            data=payload,
-            vapid_private_key=settings.VAPID_PRIVATE_KEY,
-            vapid_claims={"sub": f"mailto:{settings.VAPID_CLAIMS_EMAIL}"}
-        )
-        return response
-
-    except WebPushException as ex:
-        status_code = getattr(ex.response, "status_code", None)
-        logger.error(f"WebPushException: {ex} (status {status_code})")
-
-        # ❌ Remove expired/invalid subscriptions from DB
-        if status_code in (404, 410):  # not found / gone
-            if sub_id:
-                logger.warning(f"Deleting expired subscription {sub_id}")
-                await db.execute(delete(WebPushSubscription).where(WebPushSubscription.id == sub_id))
-                await db.commit()
-
-        elif status_code == 400:
-            logger.warning("Push request malformed (400).")
-        elif status_code == 401:
-            logger.error("Push authentication failed (401).")
-        else:
-            logger.error("Unhandled WebPush error.")
-
-        return None
+    result = await _deliver(subscription, payload, sub_id)
+    await _delete_expired([result], db)
+    return result
+
+
+async def send_push_batch(
+    subscriptions,
+    payload: str,
+    db: AsyncSession | None = None,
+    concurrency: int | None = None,
+) -> list[PushResult]:
+    """
+    Send one payload to many WebPushSubscription rows with at most
+    `concurrency` requests in flight. Returns one PushResult per subscription,
+    in input order. Expired subscriptions are deleted in a single statement.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.PUSH_CONCURRENCY)
+
+    async def deliver(sub) -> PushResult:
+        async with semaphore:
+            return await _deliver({"endpoint": sub.endpoint, "keys": sub.keys}, payload, sub.id)
+
+    results = await asyncio.gather(*(deliver(sub) for sub in subscriptions))
+    await _delete_expired(results, db)
+    return list(results)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime
+from sqlalchemy import update, select, bindparam, func, Date, Integer, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Article, ArticleDailyRead
+
+logger = logging.getLogger(__name__)
+
+# Write-behind buffer of article reads: {slug: reads since last flush}
+_pending: dict[str, int] = {}
+_flush_task: asyncio.Task | None = None
+_early_flush: asyncio.Task | None = None
+_flush_lock = asyncio.Lock()
+
+_articles = Article.__table__
+_increment_stmt = (
+    update(_articles)
+    .where(_articles.c.slug == bindparam("b_slug"))
+    .values(read_count=_articles.c.read_count + bindparam("b_reads"), updated_at=bindparam("b_now"))
+)
+
+# Per-day totals feed the windowed ("top this week") leaderboards
+_daily = ArticleDailyRead.__table__
+_daily_upsert = pg_insert(_daily).from_select(
+    ["id", "article_id", "day", "read_count"],
+    select(
+        func.gen_random_uuid(),
+        _articles.c.id,
+        bindparam("b_day", type_=Date),
+        bindparam("b_reads", type_=Integer),
+    ).where(_articles.c.slug == bindparam("b_slug", type_=String)),
+)
+_daily_upsert = _daily_upsert.on_conflict_do_update(
+    constraint="uq_article_day",
+    set_={"read_count": _daily.c.read_count + _daily_upsert.excluded.read_count},
+)
+
+
+def record_read(slug: str) -> int:
+    """Count a read in memory; returns the reads buffered for this slug."""
+    global _early_flush
+    _pending[slug] = _pending.get(slug, 0) + 1
+    reads = _pending[slug]
+    # At most one early flush in flight; a burst must not queue one per read
+    if len(_pending) > settings.READ_BUFFER_MAX_SLUGS and (_early_flush is None or _early_flush.done()):
+        _early_flush = asyncio.get_running_loop().create_task(flush())
+    return reads
+
+
+def _restore(batch: dict):
+    # Put the reads back so the next flush retries them
+    for slug, reads in batch.items():
+        _pending[slug] = _pending.get(slug, 0) + reads
+
+
+async def flush() -> int:
+    """Write buffered reads as one batched UPDATE per article. Returns articles flushed."""
+    global _pending
+    async with _flush_lock:
+        if not _pending:
+            return 0
+        batch, _pending = _pending, {}
+
+        now = datetime.utcnow()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    _increment_stmt,
+                    [{"b_slug": slug, "b_reads": reads, "b_now": now} for slug, reads in batch.items()],
+                )
+                await db.execute(
+                    _daily_upsert,
+                    [{"b_slug": slug, "b_reads": reads, "b_day": now.date()} for slug, reads in batch.items()],
+                )
+                await db.commit()
+        except asyncio.CancelledError:
+            _restore(batch)
+            raise
+        except Exception:
+            _restore(batch)
+            logger.exception("🔥 Failed to flush article read counts")
+            return 0
+
+        return len(batch)
+
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(settings.READ_FLUSH_SECONDS)
+        await flush()
+
+
+def start_read_counter():
+    global _flush_task
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.get_running_loop().create_task(_flush_loop())
+
+
+async def stop_read_counter():
+    global _flush_task
+    task, _flush_task = _flush_task, None
+    if task is not None:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await flush()  # don't drop what is still buffered on shutdown
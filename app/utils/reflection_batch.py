@@ -0,0 +1,147 @@
+"""
+Pre-generate last week's reflection for every active user, so the Monday
+visit to /weekly-reflection/latest is a plain read.
+
+The job walks users in id order, in chunks, with a bounded number of LLM
+calls in flight. After each chunk the cursor in job_cursors moves up to the
+last user before the first failure, so a restarted or retried run picks up
+where the previous one stopped without skipping anyone. Failed users get one
+more attempt at the end; the week is only marked done once none remain.
+Reflections whose inputs did not change are memoised and cost no LLM call.
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from uuid import UUID
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.helper.reflections import week_bounds, generate_reflection
+from app.models import (
+    User, JobCursor, IkeaWorksheet, IkeaTracker, CavemanSpot,
+    UserMicrochallenge, MicrochallengeLog
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "weekly_reflections"
+DONE = "done"
+
+
+def previous_week(today: date | None = None) -> tuple[date, date]:
+    today = today or datetime.utcnow().date()
+    return week_bounds(today - timedelta(days=7))
+
+
+def active_users_stmt(week_start: date, week_end: date, after_id=None, limit: int = 50):
+    """Users with a worksheet and any tracker entry, spot or microchallenge log in the week."""
+    has_worksheet = select(IkeaWorksheet.id).where(IkeaWorksheet.user_id == User.id).exists()
+    tracked = (
+        select(IkeaTracker.id)
+        .join(IkeaWorksheet, IkeaTracker.worksheet_id == IkeaWorksheet.id)
+        .where(IkeaWorksheet.user_id == User.id, IkeaTracker.date.between(week_start, week_end))
+        .exists()
+    )
+    spotted = (
+        select(CavemanSpot.id)
+        .where(CavemanSpot.user_id == User.id, CavemanSpot.date.between(week_start, week_end))
+        .exists()
+    )
+    logged = (
+        select(MicrochallengeLog.id)
+        .join(UserMicrochallenge, MicrochallengeLog.assignment_id == UserMicrochallenge.id)
+        .where(UserMicrochallenge.user_id == User.id, MicrochallengeLog.log_date.between(week_start, week_end))
+        .exists()
+    )
+
+    stmt = select(User.id).where(has_worksheet, or_(tracked, spotted, logged))
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    return stmt.order_by(User.id).limit(limit)
+
+
+async def load_cursor(db: AsyncSession, week_start: date):
+    """Last processed user id for this week, DONE, or None to start from the beginning."""
+    row = await db.get(JobCursor, JOB_NAME)
+    if not row or not row.position:
+        return None
+    week, _, position = row.position.partition(":")
+    if week != week_start.isoformat():
+        return None
+    return DONE if position == DONE else UUID(position)
+
+
+async def save_cursor(db: AsyncSession, week_start: date, position: str):
+    value = f"{week_start.isoformat()}:{position}"
+    stmt = pg_insert(JobCursor).values(name=JOB_NAME, position=value, updated_at=datetime.utcnow())
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[JobCursor.name],
+            set_={"position": stmt.excluded.position, "updated_at": stmt.excluded.updated_at},
+        )
+    )
+    await db.commit()
+
+
+async def _generate_one(user_id, week_start: date, week_end: date, semaphore: asyncio.Semaphore) -> str:
+    # generate_reflection uses its own sessions: one failure must not poison the others' transactions
+    async with semaphore:
+        try:
+            content, cached = await generate_reflection(user_id, week_start, week_end)
+        except Exception:
+            logger.exception(f"🔥 Weekly reflection failed for user {user_id}")
+            return "failed"
+    if content is None:
+        return "skipped"
+    return "cached" if cached else "generated"
+
+
+async def pregenerate_weekly_reflections(db: AsyncSession, today: date | None = None) -> dict:
+    week_start, week_end = previous_week(today)
+    cursor = await load_cursor(db, week_start)
+    if cursor == DONE:
+        logger.info(f"⏭️ Weekly reflections for {week_start} already generated")
+        return {}
+
+    totals = Counter()
+    failed = []
+    semaphore = asyncio.Semaphore(settings.REFLECTION_BATCH_CONCURRENCY)
+    after = cursor
+    while True:
+        result = await db.execute(
+            active_users_stmt(week_start, week_end, after_id=after, limit=settings.REFLECTION_BATCH_SIZE)
+        )
+        user_ids = result.scalars().all()
+        if not user_ids:
+            break
+
+        outcomes = await asyncio.gather(
+            *(_generate_one(user_id, week_start, week_end, semaphore) for user_id in user_ids)
+        )
+        for user_id, outcome in zip(user_ids, outcomes):
+            if outcome == "failed":
+                failed.append(user_id)
+            else:
+                totals[outcome] += 1
+                if not failed:
+                    cursor = user_id
+        after = user_ids[-1]
+        if cursor is not None:
+            await save_cursor(db, week_start, str(cursor))
+
+    if failed:
+        outcomes = await asyncio.gather(
+            *(_generate_one(user_id, week_start, week_end, semaphore) for user_id in failed)
+        )
+        totals.update(outcomes)
+
+    if totals["failed"]:
+        # Cursor stays before the first failure; the next run retries from there
+        logger.warning(f"⚠️ Weekly reflections for {week_start}: {totals['failed']} user(s) still failing")
+    else:
+        await save_cursor(db, week_start, DONE)
+    logger.info(f"📝 Weekly reflections for {week_start}: {dict(totals)}")
+    return dict(totals)
@@ -1,13 +1,68 @@
-import json
-from datetime import date
-from sqlalchemy import select
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, exists, func, cast, Date, Time
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import CavemanSpot, MicrochallengeLog, WebPushSubscription
-from app.utils.pushnotification import send_push
+from app.config import settings
+from app.models import CavemanSpot, UserMicrochallenge, UserPreferences, WebPushSubscription
+from app.utils import outbox
 from app.models import User
-from app.Routes.whatsapp_routes import send_whatsapp_message
-from app.helper.common import get_random_active_nudge
+from app.helper.common import get_random_active_nudge, get_nudge_of_the_day
+
+
+@dataclass
+class ReminderRecipient:
+    """A user with push devices, plus whether they already did today's action."""
+    user: User
+    subscriptions: list = field(default_factory=list)
+    done_today: bool = False
+    local_date: date | None = None  # only set in local-time mode
+
+
+def spotted_today_clause(today):
+    # Correlated against the outer User row
+    return exists().where(
+        CavemanSpot.user_id == User.id,
+        CavemanSpot.date == today,
+    )
+
+
+def logged_micro_today_clause(today):
+    # last_log_date is kept on the assignment, so no scan of the logs table
+    return exists().where(
+        UserMicrochallenge.user_id == User.id,
+        UserMicrochallenge.last_log_date == today,
+    )
+
+
+# ----------------------
+# Local-time delivery windows
+# ----------------------
+
+def local_now_expr():
+    """The user's current wall-clock time (needs user_preferences in the FROM)."""
+    tz = func.coalesce(UserPreferences.timezone, settings.DEFAULT_TIMEZONE)
+    return func.timezone(tz, func.now())
+
+
+def local_date_expr():
+    return cast(local_now_expr(), Date)
+
+
+def local_slot_conditions(slot: time) -> list:
+    """
+    Users whose local time is within [slot, slot + window). Runs every few
+    minutes overlap inside the window; the outbox key (which includes the
+    user's local date) keeps it to one delivery per day.
+    """
+    local_time = cast(local_now_expr(), Time)
+    slot_end = (datetime.combine(date.min, slot) + timedelta(minutes=settings.LOCAL_SLOT_WINDOW_MINUTES)).time()
+    return [local_time >= slot, local_time < slot_end]
+
+
+def _job_run(name: str, local_date: date | None) -> str:
+    return f"{name}:{(local_date or date.today()).isoformat()}"
+
 
 async def has_spotted_today(user_id, db: AsyncSession):
     stmt = select(CavemanSpot).where(
@@ -19,86 +74,105 @@ async def has_spotted_today(user_id, db: AsyncSession):
 
 
 async def has_logged_micro_today(user_id, db: AsyncSession):
-    stmt = select(MicrochallengeLog).where(
-        MicrochallengeLog.user_id == user_id,
-        MicrochallengeLog.log_date == date.today()
+    stmt = select(UserMicrochallenge.id).where(
+        UserMicrochallenge.user_id == user_id,
+        UserMicrochallenge.last_log_date == date.today()
     )
     result = await db.execute(stmt)
     return result.scalars().first() is not None
 
 
-async def send_spot_pushes(db: AsyncSession):
-    stmt = select(WebPushSubscription.user_id).distinct()
-    users_result = await db.execute(stmt)
-    user_ids = users_result.scalars().all()
-
-    for user_id in user_ids:
-        user_result = await db.execute(select(User).where(User.id == user_id))
-        user = user_result.scalar_one_or_none()
-
-        if not user:
-            continue
-
-        devices_stmt = select(WebPushSubscription).where(WebPushSubscription.user_id == user_id)
-        devices_result = await db.execute(devices_stmt)
-        subscriptions = devices_result.scalars().all()
-
-        if await has_spotted_today(user_id, db):
-            title = "🧠 Awareness Activated"
-            body = "Nice job spotting your caveman today!"
-        else:
-            title = "👀 Caveman Check-in"
-            body = "Did you notice your instincts in action today?"
+async def load_reminder_audience(db: AsyncSession, done_today_clause, slot: time | None = None) -> list[ReminderRecipient]:
+    """
+    Fetch every user with at least one push device, their devices and the
+    "done today" flag in a single round trip (users ⋈ web_push_subscriptions).
+
+    done_today_clause builds the EXISTS for a given "today". With a slot, only
+    users whose local time has reached it are returned, and "today" is their
+    local date.
+    """
+    today = date.today() if slot is None else local_date_expr()
+    stmt = (
+        select(User, WebPushSubscription, done_today_clause(today).label("done_today"))
+        .join(WebPushSubscription, WebPushSubscription.user_id == User.id)
+        .order_by(User.id)
+    )
+    if slot is not None:
+        stmt = (
+            stmt.add_columns(today.label("local_date"))
+            .outerjoin(UserPreferences, UserPreferences.user_id == User.id)
+            .where(*local_slot_conditions(slot))
+        )
+    result = await db.execute(stmt)
 
-        # Web push
-        for sub in subscriptions:
-            send_push(
-                {"endpoint": sub.endpoint, "keys": sub.keys},
-                payload=json.dumps({"title": title, "body": body})
+    recipients: dict = {}
+    for user, sub, done_today, *local_date in result.all():
+        recipient = recipients.get(user.id)
+        if recipient is None:
+            recipient = ReminderRecipient(
+                user=user,
+                done_today=bool(done_today),
+                local_date=local_date[0] if local_date else None,
             )
+            recipients[user.id] = recipient
+        recipient.subscriptions.append(sub)
 
-        # WhatsApp message
-        if user.phone_number and getattr(user, "whatsapp_opt_in", True):  # Add opt-in check if applicable
-            send_whatsapp_message(user.phone_number, f"{title} {body}")
-
-
+    return list(recipients.values())
 
-async def send_microchallenge_pushes(db: AsyncSession):
-    stmt = select(WebPushSubscription.user_id).distinct()
-    users_result = await db.execute(stmt)
-    user_ids = users_result.scalars().all()
 
-    for user_id in user_ids:
-        user_result = await db.execute(select(User).where(User.id == user_id))
-        user = user_result.scalar_one_or_none()
+async def _send_reminders(db: AsyncSession, job: str, done_today_clause, done_msg: tuple, open_msg: tuple, slot: time | None = None):
+    recipients = await load_reminder_audience(db, done_today_clause, slot)
 
-        if not user:
-            continue
+    # No DB work per user from here on, just one outbox row per user and channel
+    messages = []
+    for recipient in recipients:
+        user = recipient.user
+        title, body = done_msg if recipient.done_today else open_msg
+        job_run = _job_run(job, recipient.local_date)
 
-        devices_stmt = select(WebPushSubscription).where(WebPushSubscription.user_id == user_id)
-        devices_result = await db.execute(devices_stmt)
-        subscriptions = devices_result.scalars().all()
+        # Web push (every device of the user)
+        messages.append({"user_id": user.id, "channel": "push", "job_run": job_run, "payload": {"title": title, "body": body}})
 
-        if await has_logged_micro_today(user_id, db):
-            title = "🔥 Consistency Hit"
-            body = "You showed up again. That’s what builds momentum."
-        else:
-            title = "💡 Today's Micro Win"
-            body = "Your daily challenge is still open. Quick check-in?"
+        # WhatsApp message
+        if user.phone_number and getattr(user, "whatsapp_opt_in", True):  # Add opt-in check if applicable
+            messages.append({
+                "user_id": user.id,
+                "channel": "whatsapp",
+                "job_run": job_run,
+                "payload": {"to": user.phone_number, "message": f"{title} {body}"},
+            })
+
+    await outbox.enqueue(db, _job_run(job, None), messages)
+    # Local mode spans several local dates, so drain everything pending
+    return await outbox.drain(_job_run(job, None) if slot is None else None)
+
+
+async def send_spot_pushes(db: AsyncSession, slot: time | None = None):
+    return await _send_reminders(
+        db,
+        "spot_push",
+        spotted_today_clause,
+        done_msg=("🧠 Awareness Activated", "Nice job spotting your caveman today!"),
+        open_msg=("👀 Caveman Check-in", "Did you notice your instincts in action today?"),
+        slot=slot,
+    )
 
-        # Web push
-        for sub in subscriptions:
-            send_push(
-                {"endpoint": sub.endpoint, "keys": sub.keys},
-                payload=json.dumps({"title": title, "body": body})
-            )
 
-        # WhatsApp
-        if user.phone_number and getattr(user, "whatsapp_opt_in", True):
-            send_whatsapp_message(user.phone_number, f"{title} {body}")
+async def send_microchallenge_pushes(db: AsyncSession, slot: time | None = None):
+    return await _send_reminders(
+        db,
+        "microchallenge_push",
+        logged_micro_today_clause,
+        done_msg=("🔥 Consistency Hit", "You showed up again. That’s what builds momentum."),
+        open_msg=("💡 Today's Micro Win", "Your daily challenge is still open. Quick check-in?"),
+        slot=slot,
+    )
 
-async def send_daily_nudge(db: AsyncSession):
-    nudge = await get_random_active_nudge(db)
+async def send_daily_nudge(db: AsyncSession, slot: time | None = None):
+    if settings.NUDGE_OF_THE_DAY:
+        nudge = await get_nudge_of_the_day(db)
+    else:
+        nudge = await get_random_active_nudge(db)
 
     payload = {
         "title": nudge.title or "🧠 Caveman Nudge",
@@ -112,30 +186,49 @@ async def send_daily_nudge(db: AsyncSession):
     if nudge.quote:
         message += f"\n\n_{nudge.quote}_"
 
-    # Web Push
-    result = await db.execute(select(WebPushSubscription))
-    subs = result.scalars().all()
+    push_stmt = select(WebPushSubscription.user_id).distinct()
+    whatsapp_stmt = select(User).where(User.whatsapp_opt_in == True)
+    if slot is not None:
+        push_stmt = (
+            select(WebPushSubscription.user_id, local_date_expr()).distinct()
+            .outerjoin(UserPreferences, UserPreferences.user_id == WebPushSubscription.user_id)
+            .where(*local_slot_conditions(slot))
+        )
+        whatsapp_stmt = (
+            select(User, local_date_expr())
+            .outerjoin(UserPreferences, UserPreferences.user_id == User.id)
+            .where(User.whatsapp_opt_in == True, *local_slot_conditions(slot))
+        )
 
-    push_success = 0
-    for sub in subs:
-        sub_info = {"endpoint": sub.endpoint, "keys": sub.keys}
-        if send_push(sub_info, payload=json.dumps(payload)):
-            push_success += 1
+    # Web Push
+    result = await db.execute(push_stmt)
+    messages = [
+        {"user_id": user_id, "channel": "push", "job_run": _job_run("daily_nudge", local_date[0] if local_date else None), "payload": payload}
+        for user_id, *local_date in result.all()
+    ]
 
     # WhatsApp
-    result = await db.execute(select(User).where(User.whatsapp_opt_in == True))
-    whatsapp_users = result.scalars().all()
+    result = await db.execute(whatsapp_stmt)
+    messages.extend(
+        {
+            "user_id": user.id,
+            "channel": "whatsapp",
+            "job_run": _job_run("daily_nudge", local_date[0] if local_date else None),
+            "payload": {"to": user.phone_number, "message": message},
+        }
+        for user, *local_date in result.all()
+        if user.phone_number
+    )
 
-    whatsapp_success = 0
-    for user in whatsapp_users:
-        if user.phone_number:
-            if send_whatsapp_message(user.phone_number, message):
-                whatsapp_success += 1
+    # Rows already enqueued by an earlier attempt of this run keep their payload
+    job_run = _job_run("daily_nudge", None)
+    await outbox.enqueue(db, job_run, messages)
+    totals = await outbox.drain(job_run if slot is None else None)
 
     return {
         "nudge_id": str(nudge.id),
-        "push_success": push_success,
-        "whatsapp_success": whatsapp_success,
+        "push_success": totals["delivered"].get("push", 0),
+        "whatsapp_success": totals["delivered"].get("whatsapp", 0),
         "preview": payload,
         "whatsapp_message": message,
-    }
\ No newline at end of file
+    }
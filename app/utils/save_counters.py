@@ -0,0 +1,71 @@
+"""
+Single-statement save / unsave that keep articles.save_count in step with
+saved_articles.
+"""
+from datetime import datetime
+from sqlalchemy import select, update, delete, func, literal, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models import Article, SavedArticle
+
+
+def _article_cte(slug: str):
+    return select(Article.id, Article.save_count).where(Article.slug == slug).cte("article")
+
+
+def _outcome(article, changed):
+    """
+    One row per matching article: (save_count before, save_count after).
+    `after` is NULL when nothing changed; no row means the slug is unknown.
+    """
+    return select(
+        article.c.save_count.label("before"),
+        changed.c.save_count.label("after"),
+    ).select_from(article.outerjoin(changed, true()))
+
+
+def save_stmt(user_id, slug: str):
+    """Insert the bookmark (skipped if it exists) and, only if inserted, bump save_count."""
+    article = _article_cte(slug)
+    new_save = (
+        pg_insert(SavedArticle)
+        .from_select(
+            ["id", "user_id", "article_id", "created_at"],
+            select(
+                func.gen_random_uuid(),
+                literal(user_id, SavedArticle.user_id.type),
+                article.c.id,
+                literal(datetime.utcnow(), SavedArticle.created_at.type),
+            ),
+        )
+        .on_conflict_do_nothing(constraint="uq_user_article")
+        .returning(SavedArticle.article_id)
+        .cte("new_save")
+    )
+    bumped = (
+        update(Article)
+        .where(Article.id == new_save.c.article_id)
+        .values(save_count=Article.save_count + 1)
+        .returning(Article.save_count)
+        .cte("bumped")
+    )
+    return _outcome(article, bumped)
+
+
+def unsave_stmt(user_id, slug: str):
+    """Delete the bookmark and, only if one was deleted, decrement save_count (never below 0)."""
+    article = _article_cte(slug)
+    removed = (
+        delete(SavedArticle)
+        .where(SavedArticle.user_id == user_id, SavedArticle.article_id == article.c.id)
+        .returning(SavedArticle.article_id)
+        .cte("removed")
+    )
+    dropped = (
+        update(Article)
+        .where(Article.id == removed.c.article_id)
+        .values(save_count=func.greatest(Article.save_count - 1, 0))
+        .returning(Article.save_count)
+        .cte("dropped")
+    )
+    return _outcome(article, dropped)
@@ -1,17 +1,23 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.exc import OperationalError
 import asyncio
 import logging
+from functools import partial
 from pytz import timezone
+from datetime import datetime, time
 
+from app.config import settings
 from app.database import AsyncSessionLocal
 from app.utils.reminder_engine import (
     send_spot_pushes,
     send_microchallenge_pushes,
     send_daily_nudge
 )
-from app.Routes.notifications_routes import send_daily_nudge
+from app.utils import outbox, leader
+from app.utils.auth import auth_cache_stats
+from app.utils.reflection_batch import pregenerate_weekly_reflections
 
 # Setup logging for visibility in Azure logs
 logging.basicConfig(level=logging.INFO)
@@ -21,12 +27,48 @@ logger = logging.getLogger("apscheduler")
 scheduler = AsyncIOScheduler()
 india_tz = timezone("Asia/Kolkata")
 
+# Local delivery slots (user's wall-clock time in local mode, IST in fixed mode)
+BEHAVIORAL_SLOT = time(9, 0)
+CHALLENGE_SLOT = time(13, 0)
+SPOT_SLOT = time(20, 0)
+
+# Monday from 06:00 IST: the UTC week has closed and traffic is low. Re-run
+# hourly for the rest of the day; a finished week returns at once, a week
+# with failed users resumes from its cursor
+REFLECTION_DAY = "mon"
+REFLECTION_SLOT = time(6, 0)
+
 def start_scheduler():
-    scheduler.add_job(run_behavioral_job, CronTrigger(hour=9, minute=0, timezone=india_tz), id="behavioral_job")
-    scheduler.add_job(run_challenge_job, CronTrigger(hour=13, minute=0, timezone=india_tz), id="challenge_job")
-    scheduler.add_job(run_spot_job, CronTrigger(hour=20, minute=0, timezone=india_tz), id="spot_job")
+    # Every process runs the scheduler, but cron jobs only fire on the elected leader
+    scheduler.add_job(
+        leader.ensure_leadership,
+        IntervalTrigger(seconds=settings.LEADER_CHECK_SECONDS),
+        id="leader_election",
+        next_run_time=datetime.now(india_tz),
+    )
+    if settings.SCHEDULER_MODE == "local":
+        # Run often and pick only users whose local time has reached the slot
+        every = CronTrigger(minute=f"*/{settings.LOCAL_SLOT_INTERVAL_MINUTES}", timezone=india_tz)
+        scheduler.add_job(run_behavioral_job, every, id="behavioral_job")
+        scheduler.add_job(run_challenge_job, every, id="challenge_job")
+        scheduler.add_job(run_spot_job, every, id="spot_job")
+    else:
+        scheduler.add_job(run_behavioral_job, CronTrigger(hour=BEHAVIORAL_SLOT.hour, minute=BEHAVIORAL_SLOT.minute, timezone=india_tz), id="behavioral_job")
+        scheduler.add_job(run_challenge_job, CronTrigger(hour=CHALLENGE_SLOT.hour, minute=CHALLENGE_SLOT.minute, timezone=india_tz), id="challenge_job")
+        scheduler.add_job(run_spot_job, CronTrigger(hour=SPOT_SLOT.hour, minute=SPOT_SLOT.minute, timezone=india_tz), id="spot_job")
+    scheduler.add_job(
+        log_cache_stats,
+        IntervalTrigger(seconds=settings.CACHE_STATS_LOG_SECONDS),
+        id="cache_stats",
+    )
+    scheduler.add_job(run_outbox_job, CronTrigger(minute="*/5", timezone=india_tz), id="outbox_job")
+    scheduler.add_job(
+        run_reflection_job,
+        CronTrigger(day_of_week=REFLECTION_DAY, hour=f"{REFLECTION_SLOT.hour}-23", minute=REFLECTION_SLOT.minute, timezone=india_tz),
+        id="reflection_job",
+    )
     scheduler.start()
-    logger.info("✅ Scheduler started with behavioral (9AM), challenge (12PM), and spot (8PM) jobs")
+    logger.info(f"✅ Scheduler started ({settings.SCHEDULER_MODE} mode) with behavioral (9AM), challenge (1PM), and spot (8PM) jobs")
 
 # Robust safe DB wrapper
 async def run_safe(task_func, name: str):
@@ -43,12 +85,44 @@ async def run_safe(task_func, name: str):
             logger.exception(f"🔥 Unexpected error in job '{name}': {e}")
             break
 
+async def run_as_leader(task_func, name: str):
+    # Check the lock now rather than trusting the heartbeat's cached flag, so a
+    # cron firing mid-failover runs on whichever process can take the lock
+    if not await leader.ensure_leadership():
+        logger.info(f"⏭️ Skipping job '{name}': not the scheduler leader")
+        return
+    await run_safe(task_func, name)
+
+def _for_slot(task_func, slot: time):
+    # Fixed mode keeps the global IST schedule; local mode filters by user time
+    return partial(task_func, slot=slot) if settings.SCHEDULER_MODE == "local" else task_func
+
 # Individual job runners
 async def run_spot_job():
-    await run_safe(send_spot_pushes, "spot_push")
+    await run_as_leader(_for_slot(send_spot_pushes, SPOT_SLOT), "spot_push")
 
 async def run_challenge_job():
-    await run_safe(send_microchallenge_pushes, "microchallenge_push")
+    await run_as_leader(_for_slot(send_microchallenge_pushes, CHALLENGE_SLOT), "microchallenge_push")
 
 async def run_behavioral_job():
-     await run_safe(send_daily_nudge, "daily_nudge")
\ No newline at end of file
+     await run_as_leader(_for_slot(send_daily_nudge, BEHAVIORAL_SLOT), "daily_nudge")
+
+async def drain_outbox(db):
+    # Resumes runs cut short by a restart; delivered rows are never re-sent
+    await outbox.expire_stale(db)
+    await outbox.drain()
+
+# Not leader-gated: SKIP LOCKED lets every process drain in parallel
+async def run_outbox_job():
+    await run_safe(drain_outbox, "outbox_drain")
+
+# Not leader-gated: the caches are per process, so every worker reports its own
+def log_cache_stats():
+    for name, stats in auth_cache_stats().items():
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+        logger.info(f"📊 Auth {name} cache: {stats} hit rate {hit_rate}")
+
+# Leader-gated; a retried or restarted run resumes from the job cursor
+async def run_reflection_job():
+    await run_as_leader(pregenerate_weekly_reflections, "weekly_reflections")
@@ -0,0 +1,83 @@
+from app.config import settings
+from dataclasses import dataclass
+import asyncio
+import httpx
+import logging
+
+logger = logging.getLogger("whatsapp")
+
+TWILIO_API_BASE = "https://api.twilio.com/2010-04-01"
+
+# Shared client so every message reuses pooled keep-alive TLS connections
+_client: httpx.AsyncClient | None = None
+
+
+@dataclass
+class WhatsAppResult:
+    to: str
+    ok: bool = False
+    status_code: int | None = None
+    sid: str | None = None
+    error: str | None = None
+
+
+def get_whatsapp_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=f"{TWILIO_API_BASE}/Accounts/{settings.TWILIO_ACCOUNT_SID}",
+            auth=(settings.TWILIO_ACCOUNT_SID or "", settings.TWILIO_AUTH_TOKEN or ""),
+            timeout=settings.WHATSAPP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.WHATSAPP_CONCURRENCY,
+                max_keepalive_connections=settings.WHATSAPP_CONCURRENCY,
+            ),
+        )
+    return _client
+
+
+async def close_whatsapp_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def send_whatsapp_message(to_number: str, message: str) -> WhatsAppResult:
+    result = WhatsAppResult(to=to_number)
+    data = {
+        "From": settings.TWILIO_WHATSAPP_NUMBER,
+        "To": f"whatsapp:{to_number}",
+        "Body": message,
+    }
+
+    try:
+        response = await get_whatsapp_client().post("/Messages.json", data=data)
+    except Exception as e:
+        logger.exception("🔥 Error sending WhatsApp message to %s", to_number)
+        result.error = str(e)
+        return result
+
+    result.status_code = response.status_code
+    if response.status_code == 201:
+        result.ok = True
+        result.sid = response.json().get("sid")
+        logger.info("✅ WhatsApp message sent to %s", to_number)
+    else:
+        result.error = response.text
+        logger.warning("⚠️ Failed to send WhatsApp message to %s | %s", to_number, response.text)
+    return result
+
+
+async def send_many(messages, concurrency: int | None = None) -> list[WhatsAppResult]:
+    """
+    Send (to_number, message) pairs with at most `concurrency` requests in
+    flight. Returns one WhatsAppResult per pair, in input order.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.WHATSAPP_CONCURRENCY)
+
+    async def send(to_number: str, message: str) -> WhatsAppResult:
+        async with semaphore:
+            return await send_whatsapp_message(to_number, message)
+
+    return list(await asyncio.gather(*(send(to, msg) for to, msg in messages)))
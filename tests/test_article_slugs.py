@@ -0,0 +1,45 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.helper.article_slugs import ArticleSlugCatalog
+from app.Routes import article_routes
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        rows = list(self.rows)
+
+        class Result:
+            def all(self):
+                return rows
+
+        return Result()
+
+
+def test_unknown_slug_is_rejected_before_buffering(monkeypatch):
+    article_id = uuid.uuid4()
+    db = FakeDB([("known", article_id)])
+    recorded = []
+    monkeypatch.setattr(article_routes, "article_slugs", ArticleSlugCatalog(ttl=300))
+    monkeypatch.setattr(article_routes, "record_read", lambda slug: recorded.append(slug) or 1)
+    monkeypatch.setattr(article_routes, "track_event", lambda *args: None)
+
+    async def scenario():
+        ok = await article_routes.increment_article_read("known", db=db)
+        with pytest.raises(HTTPException) as exc:
+            await article_routes.increment_article_read("missing", db=db)
+        return ok, exc.value
+
+    ok, error = asyncio.run(scenario())
+    assert ok["status"] == "queued"
+    assert error.status_code == 404
+    assert recorded == ["known"]
+    assert db.queries == 1  # the miss was answered from memory, inside the reload window
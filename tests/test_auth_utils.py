@@ -18,3 +18,126 @@ def test_create_and_decode_token():
 
 def test_decode_token_invalid():
     assert auth.decode_token("invalid-token") is None
+
+
+class FakeUserSession:
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        user = self.user
+
+        class Result:
+            def scalar_one_or_none(self):
+                return user
+
+        return Result()
+
+
+def test_get_current_user_is_cached_until_invalidated():
+    import asyncio
+    import uuid
+    from types import SimpleNamespace
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    user_id = uuid.uuid4()
+    db = FakeUserSession(SimpleNamespace(id=user_id, email="a@b.c", name="A"))
+    token = auth.create_access_token({"sub": str(user_id)})
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    first = asyncio.run(auth.get_current_user(creds, None, db))
+    second = asyncio.run(auth.get_current_user(creds, None, db))
+    assert first == second
+    assert first.email == "a@b.c"
+    assert db.queries == 1
+
+    auth.invalidate_user(user_id)
+    asyncio.run(auth.get_current_user(creds, None, db))
+    assert db.queries == 2
+
+    assert asyncio.run(auth.get_current_user_id(creds, None)) == user_id
+
+
+def test_async_hashing_and_rehash_on_cost_change(monkeypatch):
+    import asyncio
+    from passlib.context import CryptContext
+
+    hashed = asyncio.run(auth.hash_password_async("pw"))
+    valid, new_hash = asyncio.run(auth.verify_and_update_password("pw", hashed))
+    assert valid and new_hash is None
+
+    valid, _ = asyncio.run(auth.verify_and_update_password("nope", hashed))
+    assert not valid
+
+    cheaper = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4, bcrypt__min_rounds=4, bcrypt__max_rounds=4)
+    monkeypatch.setattr(auth, "pwd_context", cheaper)
+    valid, new_hash = asyncio.run(auth.verify_and_update_password("pw", hashed))
+    assert valid
+    assert new_hash.startswith("$2b$04$")
+
+
+def test_verified_tokens_are_cached_until_exp(monkeypatch):
+    token = auth.create_access_token({"sub": "cached-user"}, expires_delta=timedelta(minutes=5))
+    auth._token_cache.clear()
+
+    calls = []
+    real_decode = auth.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+
+    assert auth.decode_token(token)["sub"] == "cached-user"
+    assert auth.decode_token(token)["sub"] == "cached-user"
+    assert len(calls) == 1
+    assert auth.auth_cache_stats()["tokens"]["hits"] >= 1
+
+    # Invalid tokens are never cached
+    assert auth.decode_token("invalid-token") is None
+    assert auth.decode_token("invalid-token") is None
+    assert len(calls) == 3
+
+    # Entries expire at the token's own exp claim
+    expired = auth.create_access_token({"sub": "old"}, expires_delta=timedelta(seconds=-1))
+    assert auth.decode_token(expired) is None
+
+
+def test_cached_token_entries_expire_at_exp_or_max_ttl(monkeypatch):
+    from app.utils import cache
+
+    now = 1000.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+    auth._token_cache.clear()
+
+    calls = []
+    real_decode = auth.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+
+    # Short-lived token: the cache entry lives until the token's exp (~300s)
+    short = auth.create_access_token({"sub": "short"}, expires_delta=timedelta(minutes=5))
+    auth.verify_token(short)
+    now += 290
+    auth.verify_token(short)
+    assert len(calls) == 1
+    now += 20  # past exp as seen by the cache clock
+    auth.verify_token(short)
+    assert len(calls) == 2
+
+    # Long-lived token: capped at TOKEN_CACHE_MAX_TTL
+    long = auth.create_access_token({"sub": "long"}, expires_delta=timedelta(days=1))
+    auth.verify_token(long)
+    now += auth._token_cache.ttl - 1
+    auth.verify_token(long)
+    assert len(calls) == 3
+    now += 2
+    auth.verify_token(long)
+    assert len(calls) == 4
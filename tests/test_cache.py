@@ -0,0 +1,36 @@
+from app.utils import cache
+
+
+def test_ttl_cache_expiry_and_lru(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+
+    c = cache.TTLCache(maxsize=2, ttl=10)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1
+
+    # "b" is least recently used and gets evicted
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1
+
+    now += 10
+    assert c.get("a") is None
+    assert c.stats()["hits"] == 2
+    assert c.stats()["misses"] == 2
+
+
+def test_ttl_cache_entry_ttl_only_shortens(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+
+    c = cache.TTLCache(maxsize=10, ttl=10)
+    c.set("short", 1, ttl=2)
+    c.set("long", 1, ttl=60)
+    c.set("expired", 1, ttl=0)
+
+    now += 5
+    assert c.get("short") is None
+    assert c.get("long") == 1
+    assert len(c) == 1
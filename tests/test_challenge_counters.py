@@ -0,0 +1,42 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+
+from app.utils import challenge_counters
+
+
+def compile_pg(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_log_and_count_is_a_single_statement():
+    sql = compile_pg(challenge_counters.log_and_count_stmt("a1", date(2025, 1, 1), "note"))
+
+    assert sql.startswith("WITH new_log AS")
+    assert "ON CONFLICT ON CONSTRAINT uq_assignment_log_date DO NOTHING" in sql
+    assert "log_count=(user_microchallenges.log_count +" in sql
+    assert "FROM new_log WHERE user_microchallenges.id = new_log.assignment_id" in sql
+
+
+def test_repair_log_counters_only_touches_drifted_rows():
+    class Result:
+        rowcount = 2
+
+    class FakeSession:
+        def __init__(self):
+            self.statements = []
+            self.commits = 0
+
+        async def execute(self, stmt):
+            self.statements.append(compile_pg(stmt))
+            return Result()
+
+        async def commit(self):
+            self.commits += 1
+
+    db = FakeSession()
+    assert asyncio.run(challenge_counters.repair_log_counters(db)) == 4
+    assert db.commits == 1
+    assert "IS DISTINCT FROM" in db.statements[0]
+    assert "NOT (EXISTS" in db.statements[1]
@@ -0,0 +1,121 @@
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy.dialects import postgresql
+
+from app.helper.pagination import PageParams
+from app.Routes import challenge_routes
+
+USER = SimpleNamespace(id=uuid.uuid4(), email="u@example.com", name="U")
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeDB:
+    """Returns canned results in order and keeps the compiled SQL of each query."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sql = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})))
+        return FakeResult(self.results.pop(0))
+
+    def add(self, obj):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+
+def assignment(log_count, challenge_id="c1", status="active", days_ago=3):
+    return SimpleNamespace(
+        id=uuid.uuid4(), user_id=USER.id, challenge_id=challenge_id, status=status,
+        started_at=datetime.utcnow() - timedelta(days=days_ago), completed_at=None, log_count=log_count,
+    )
+
+
+def definition(cid):
+    return SimpleNamespace(id=cid, title=f"title {cid}", intro=[], instructions=[], why="", tips=[], closing="")
+
+
+def test_my_challenges_read_counts_from_the_assignment(monkeypatch):
+    class Store:
+        async def get_many(self, db, ids):
+            return {cid: definition(cid) for cid in ids}
+
+    monkeypatch.setattr(challenge_routes, "challenge_store", Store())
+    logged, untouched = assignment(log_count=7, challenge_id="c1"), assignment(log_count=0, challenge_id="c2")
+    db = FakeDB([logged, untouched])
+
+    items = asyncio.run(challenge_routes.my_microchallenges(Response(), PageParams(limit=50, cursor=None), db, USER))
+
+    # one query for the page; no per-assignment log counting
+    assert len(db.sql) == 1
+    assert "microchallenge_logs" not in db.sql[0]
+    assert {i["challenge_id"]: i["progress"] for i in items} == {"c1": 33.3, "c2": 0.0}
+    assert db.commits == 0
+
+
+def test_progress_of_assignment_with_no_logs():
+    db = FakeDB([assignment(log_count=0, days_ago=0)], [])
+
+    body = asyncio.run(challenge_routes.get_progress(uuid.uuid4(), True, db, USER))
+
+    assert body["completed_days"] == 0
+    assert body["success_ratio"] == 0.0
+    assert body["notes"] == []
+
+
+def test_notes_are_paged():
+    notes = [(date(2025, 1, 2), "second"), (date(2025, 1, 3), None)]
+    db = FakeDB([assignment(log_count=3)], notes)
+
+    body = asyncio.run(challenge_routes.get_progress_notes(uuid.uuid4(), limit=2, offset=1, db=db, current_user=USER))
+
+    assert body == {
+        "notes": [{"date": "2025-01-02", "note": "second"}, {"date": "2025-01-03", "note": ""}],
+        "limit": 2,
+        "offset": 1,
+    }
+    assert "ORDER BY microchallenge_logs.log_date" in db.sql[1]
+    assert "LIMIT 2 OFFSET 1" in db.sql[1]
+
+
+def test_progress_without_notes_skips_the_notes_query():
+    db = FakeDB([assignment(log_count=2)])
+    body = asyncio.run(challenge_routes.get_progress(uuid.uuid4(), False, db, USER))
+    assert body["notes"] is None
+    assert len(db.sql) == 1
+
+
+@pytest.mark.parametrize("call", ["progress", "notes"])
+def test_someone_elses_assignment_is_404(call):
+    db = FakeDB([])  # ownership filter matched nothing
+    if call == "progress":
+        coro = challenge_routes.get_progress(uuid.uuid4(), True, db, USER)
+    else:
+        coro = challenge_routes.get_progress_notes(uuid.uuid4(), limit=10, offset=0, db=db, current_user=USER)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(coro)
+    assert exc.value.status_code == 404
+    assert f"user_microchallenges.user_id = '{USER.id}'" in db.sql[0]
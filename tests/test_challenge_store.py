@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.helper import catalog, challenges
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        rows = list(self.rows)
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return rows
+
+        return Result()
+
+
+def make_definition(i):
+    return SimpleNamespace(
+        id=f"c{i}", title=f"t{i}", intro=[], instructions=[], why="", tips=[], closing="", created_at=None
+    )
+
+
+def test_store_serves_definitions_from_memory():
+    store = challenges.ChallengeDefinitionStore(ttl=3600)
+    db = FakeSession([make_definition(i) for i in range(3)])
+
+    async def scenario():
+        await store.load(db)
+        assert [c.id for c in await store.all(db)] == ["c0", "c1", "c2"]
+        assert (await store.get(db, "c1")).title == "t1"
+        assert set(await store.get_many(db, {"c0", "c2"})) == {"c0", "c2"}
+        assert db.queries == 1
+
+        store.invalidate()
+        await store.all(db)
+        assert db.queries == 2
+
+    asyncio.run(scenario())
+
+
+def test_store_reloads_on_miss_at_most_once_per_window(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(catalog.time, "monotonic", lambda: now)
+
+    store = challenges.ChallengeDefinitionStore(ttl=3600)
+    db = FakeSession([make_definition(0)])
+
+    async def scenario():
+        nonlocal now
+        await store.load(db)
+        assert await store.get(db, "new") is None
+        assert db.queries == 1  # just loaded, don't hammer the DB on unknown ids
+
+        db.rows.append(make_definition("new"))
+        now += catalog.MISS_RELOAD_SECONDS + 1
+        assert (await store.get(db, "cnew")).id == "cnew"
+        assert db.queries == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_reload(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(catalog.time, "monotonic", lambda: now)
+
+    store = challenges.ChallengeDefinitionStore(ttl=3600)
+
+    class SlowSession(FakeSession):
+        async def execute(self, stmt):
+            await asyncio.sleep(0)  # let the other misses queue on the lock
+            return await super().execute(stmt)
+
+    db = SlowSession([make_definition(0)])
+
+    async def scenario():
+        nonlocal now
+        await store.load(db)
+        now += catalog.MISS_RELOAD_SECONDS + 1
+        return await asyncio.gather(*(store.get(db, "unknown") for _ in range(10)))
+
+    assert asyncio.run(scenario()) == [None] * 10
+    assert db.queries == 2  # initial load + a single reload
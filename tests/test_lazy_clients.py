@@ -0,0 +1,21 @@
+import sys
+
+import pytest
+
+from app.utils import llm
+
+
+def test_openai_client_needs_key_only_when_used(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(llm, "_client", None)
+
+    with pytest.raises(RuntimeError):
+        llm.get_openai_client()
+
+
+def test_heavy_sdks_are_not_imported_by_route_modules():
+    import app.Routes.auth_routes  # noqa: F401
+    import app.analytics.posthog_client  # noqa: F401
+
+    assert "firebase_admin" not in sys.modules
+    assert "posthog" not in sys.modules
@@ -0,0 +1,83 @@
+import asyncio
+
+from app.utils import leader
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeConnection:
+    def __init__(self, acquired):
+        self.acquired = acquired
+        self.sql = []
+        self.closed = False
+        self.broken = False
+
+    async def execute(self, stmt, params=None):
+        if self.broken:
+            raise ConnectionError("gone")
+        self.sql.append(str(stmt))
+        return FakeResult(self.acquired)
+
+    async def commit(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    async def invalidate(self):
+        self.closed = True
+
+
+class FakeEngine:
+    def __init__(self, *conns):
+        self.conns = list(conns)
+
+    async def connect(self):
+        return self.conns.pop(0)
+
+
+def reset(monkeypatch, engine):
+    monkeypatch.setattr(leader, "engine", engine)
+    monkeypatch.setattr(leader, "_conn", None)
+    monkeypatch.setattr(leader, "_is_leader", False)
+
+
+def test_follower_does_not_keep_connection(monkeypatch):
+    conn = FakeConnection(acquired=False)
+    reset(monkeypatch, FakeEngine(conn))
+
+    assert asyncio.run(leader.ensure_leadership()) is False
+    assert not leader.is_leader()
+    assert conn.closed
+
+
+def test_leader_keeps_lock_and_fails_over(monkeypatch):
+    first = FakeConnection(acquired=True)
+    second = FakeConnection(acquired=True)
+    reset(monkeypatch, FakeEngine(first, second))
+
+    async def scenario():
+        assert await leader.ensure_leadership() is True
+        assert not first.closed
+
+        # Heartbeat on the held connection, no new lock attempt
+        assert await leader.ensure_leadership() is True
+        assert first.sql[-1] == "SELECT 1"
+
+        # Connection drops: leadership is re-acquired on a fresh one
+        first.broken = True
+        assert await leader.ensure_leadership() is True
+        assert first.closed
+        assert "pg_try_advisory_lock" in second.sql[0]
+
+        await leader.release_leadership()
+        assert "pg_advisory_unlock" in second.sql[-1]
+        assert not leader.is_leader()
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.utils.leaderboard import Leaderboard, MAX_LIMIT
+
+
+def article(slug, reads):
+    return SimpleNamespace(slug=slug, title=slug.title(), excerpt="", read_count=reads, save_count=0)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    def __init__(self):
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        if "article_daily_reads" not in str(stmt):  # all-time board
+            return FakeResult([article("a", 10), article("b", 5)])
+        return FakeResult([(article("b", 5), 4)])
+
+
+def test_top_is_served_from_memory_until_invalidated():
+    board = Leaderboard(ttl=60)
+    db = FakeDB()
+
+    async def scenario():
+        first = await board.top(db, limit=1)
+        week = await board.top(db, limit=MAX_LIMIT, window="week")
+        board.invalidate()
+        await board.top(db)
+        return first, week
+
+    first, week = asyncio.run(scenario())
+    assert [a["slug"] for a in first] == ["a"]
+    assert week == [{"slug": "b", "title": "B", "excerpt": "", "read_count": 5, "save_count": 0, "window_reads": 4}]
+    # one rebuild (all/week/month) before the invalidation, one after
+    assert db.queries == 6
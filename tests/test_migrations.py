@@ -0,0 +1,125 @@
+import asyncio
+import inspect
+import sqlite3
+from importlib import import_module
+
+from app.migrations import discover
+from app.migrations.ops import create_index_concurrently
+from app.migrations.explain import seq_scans
+from app.models import Base
+
+
+def test_migrations_are_ordered_and_complete():
+    migrations = discover()
+    revisions = [m.revision for m in migrations]
+
+    assert revisions == sorted(revisions)
+    assert revisions[0] == "0001"
+    assert all(asyncio.iscoroutinefunction(m.upgrade) for m in migrations)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    assert not next(m for m in migrations if m.revision == "0003").transactional
+
+
+def test_hot_path_indexes_match_the_models():
+    indexes = import_module("app.migrations.versions.0003_hot_path_indexes").INDEXES
+    model_indexes = {ix.name for table in Base.metadata.tables.values() for ix in table.indexes}
+    assert set(indexes) <= model_indexes
+
+
+class SqliteConn:
+    """
+    Replays migration SQL on sqlite, minus the Postgres-only bits
+    (CONCURRENTLY, ADD COLUMN IF NOT EXISTS, the pg_index validity check).
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.statements = []
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        self.statements.append(sql)
+        if "pg_index" not in sql:
+            self.db.execute(sql.replace(" CONCURRENTLY", "").replace("ADD COLUMN IF NOT EXISTS", "ADD COLUMN"))
+
+        class Result:
+            def scalar_one_or_none(self):
+                return None
+
+        return Result()
+
+
+def replay(db, migrations):
+    conn = SqliteConn(db)
+    for migration in migrations:
+        asyncio.run(migration.upgrade(conn))
+    return conn
+
+
+def test_migrations_build_the_model_schema():
+    db = sqlite3.connect(":memory:")
+    migrations = discover()
+    statements = replay(db, migrations).statements
+
+    for table in Base.metadata.tables.values():
+        columns = {row[1] for row in db.execute(f"PRAGMA table_info({table.name})")}
+        assert columns == {c.name for c in table.columns}, table.name
+        indexes = {row[1] for row in db.execute(f"PRAGMA index_list({table.name})")}
+        assert {ix.name for ix in table.indexes} <= indexes, table.name
+
+    # Indexes on populated tables are only ever built concurrently, never inside 0001's transaction
+    baseline = replay(sqlite3.connect(":memory:"), migrations[:1]).statements
+    hot_path = import_module("app.migrations.versions.0003_hot_path_indexes").INDEXES
+    assert not any(name in sql for name in hot_path for sql in baseline)
+    assert all(
+        "CONCURRENTLY" in sql for sql in statements if any(f" {name} " in sql for name in hot_path)
+    )
+
+
+def test_baseline_is_a_no_op_on_an_existing_database():
+    # Production before migrations: the pre-series tables, without later columns
+    db = sqlite3.connect(":memory:")
+    migrations = discover()
+    replay(db, migrations[:1])
+    replay(db, migrations)  # 0001 again, then the rest, without errors
+
+
+def test_frozen_migrations_do_not_read_the_models():
+    for migration in discover():
+        assert "app.models" not in inspect.getsource(inspect.getmodule(migration.upgrade))
+
+
+class FakeConn:
+    def __init__(self, valid):
+        self.valid = valid
+        self.statements = []
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(str(stmt))
+        valid = self.valid
+
+        class Result:
+            def scalar_one_or_none(self):
+                return valid
+
+        return Result()
+
+
+def test_invalid_index_is_dropped_before_rebuilding():
+    def run(valid):
+        conn = FakeConn(valid)
+        asyncio.run(create_index_concurrently(conn, "ix_spots_user_date", "spots (user_id, date, id)"))
+        return conn.statements[1:]
+
+    create = "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_spots_user_date ON spots (user_id, date, id)"
+    assert run(False) == ["DROP INDEX CONCURRENTLY IF EXISTS ix_spots_user_date", create]
+    assert run(True) == [create]
+    assert run(None) == [create]  # not built yet
+
+
+def test_seq_scans_are_flagged():
+    plans = {
+        "spots page": ["Limit", "  ->  Index Scan Backward using ix_spots_user_date on spots"],
+        "push subscriptions": ["Seq Scan on web_push_subscriptions"],
+    }
+    assert seq_scans(plans) == ["push subscriptions"]
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.helper import common
+
+
+class FakeSession:
+    def __init__(self, nudges):
+        self.nudges = nudges
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        nudges = self.nudges
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return nudges
+
+        return Result()
+
+
+def make_nudge(i):
+    return SimpleNamespace(id=f"n{i}", title=f"t{i}", paragraphs=["p"], quote=None, link=None)
+
+
+def test_catalog_serves_from_memory_until_invalidated():
+    catalog = common.NudgeCatalog(ttl=300)
+    db = FakeSession([make_nudge(i) for i in range(5)])
+
+    async def scenario():
+        picks = [await catalog.random(db) for _ in range(20)]
+        assert {p.id for p in picks} <= {f"n{i}" for i in range(5)}
+        assert db.queries == 1
+
+        catalog.invalidate()
+        await catalog.random(db)
+        assert db.queries == 2
+
+    asyncio.run(scenario())
+
+
+def test_nudge_of_the_day_is_stable():
+    catalog = common.NudgeCatalog(ttl=300)
+    db = FakeSession([make_nudge(i) for i in range(7)])
+
+    async def scenario():
+        day = date(2025, 3, 1)
+        first = await catalog.of_the_day(db, day)
+        assert all([(await catalog.of_the_day(db, day)) == first for _ in range(5)])
+        picks = {(await catalog.of_the_day(db, date(2025, 3, d))).id for d in range(1, 29)}
+        assert len(picks) > 1
+
+    asyncio.run(scenario())
+
+
+def test_empty_catalog_raises_404():
+    catalog = common.NudgeCatalog(ttl=300)
+    with pytest.raises(HTTPException):
+        asyncio.run(catalog.random(FakeSession([])))
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.utils import outbox
+from app.utils.pushnotification import PushResult
+from app.utils.whatsapp import WhatsAppResult
+
+
+class FakeResult:
+    def __init__(self, rows=None, rowcount=0):
+        self.rows = rows or []
+        self.rowcount = rowcount
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self.results.pop(0) if self.results else FakeResult()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def make_row(user_id, channel, payload):
+    return SimpleNamespace(user_id=user_id, channel=channel, payload=payload, status="pending", attempts=0, last_error=None)
+
+
+def test_enqueue_is_idempotent_and_chunked(monkeypatch):
+    monkeypatch.setattr(outbox, "ENQUEUE_CHUNK_SIZE", 2)
+    db = FakeSession([FakeResult(rowcount=2), FakeResult(rowcount=0)])
+    messages = [{"user_id": f"u{i}", "channel": "push", "payload": {}} for i in range(3)]
+
+    inserted = asyncio.run(outbox.enqueue(db, "spot_push:2025-01-01", messages))
+
+    assert inserted == 2
+    assert len(db.statements) == 2
+    assert db.commits == 1
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (idempotency_key) DO NOTHING" in sql
+
+
+def test_drain_once_marks_outcomes(monkeypatch):
+    rows = [
+        make_row("u1", "push", {"title": "t"}),
+        make_row("u2", "push", {"title": "t"}),
+        make_row("u1", "whatsapp", {"to": "+1", "message": "hi"}),
+    ]
+    subs = [SimpleNamespace(id="s1", user_id="u1", endpoint="e1", keys={})]
+    db = FakeSession([FakeResult(rows), FakeResult(subs)])
+
+    async def fake_push_batch(subscriptions, payload):
+        return [PushResult(endpoint=s.endpoint, sub_id=s.id, status_code=201) for s in subscriptions]
+
+    async def fake_send_many(messages):
+        return [WhatsAppResult(to=to, ok=False, error="bad") for to, _ in messages]
+
+    monkeypatch.setattr(outbox, "send_push_batch", fake_push_batch)
+    monkeypatch.setattr(outbox, "send_many", fake_send_many)
+
+    counts = asyncio.run(outbox.drain_once(db))
+
+    assert counts == {"claimed": 3, "delivered": {"push": 1}, "failed": {"push": 1, "whatsapp": 1}}
+    assert [r.status for r in rows] == ["delivered", "failed", "failed"]
+    assert rows[1].last_error == "no push subscriptions"
+    assert db.commits == 1
+    claim_sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in claim_sql
@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+
+from app.helper import pagination
+from app.models import CavemanSpot
+
+
+def page(limit=2, cursor=None):
+    return pagination.PageParams(limit=limit, cursor=cursor)
+
+
+def test_cursor_round_trip_and_next_page_header():
+    rows = [(date(2025, 1, d), f"00000000-0000-0000-0000-00000000000{d}") for d in (3, 2, 1)]
+    response = Response()
+
+    items = pagination.paginate(rows, page(), response, key=lambda r: r)
+    assert items == rows[:2]
+
+    cursor = response.headers[pagination.NEXT_CURSOR_HEADER]
+    sort_value, row_id = pagination.decode_cursor(cursor, CavemanSpot.date, CavemanSpot.id)
+    assert sort_value == date(2025, 1, 2)
+    assert str(row_id) == rows[1][1]
+
+    # last page: no header
+    last = Response()
+    pagination.paginate(rows[2:], page(), last, key=lambda r: r)
+    assert pagination.NEXT_CURSOR_HEADER not in last.headers
+
+
+def test_keyset_filters_after_cursor():
+    cursor = pagination.encode_cursor(date(2025, 1, 2), "00000000-0000-0000-0000-000000000002")
+    stmt = pagination.keyset(select(CavemanSpot), CavemanSpot.date, CavemanSpot.id, page(cursor=cursor))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "(spots.date, spots.id) < (" in sql
+    assert "ORDER BY spots.date DESC, spots.id DESC" in sql
+    assert "LIMIT" in sql
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        pagination.decode_cursor("not-a-cursor", CavemanSpot.date, CavemanSpot.id)
+    assert exc.value.status_code == 400
+
+
+def test_null_sort_keys_stay_in_the_page_sequence():
+    row_id = "00000000-0000-0000-0000-000000000002"
+    cursor = pagination.encode_cursor(None, row_id)
+    assert pagination.decode_cursor(cursor, CavemanSpot.date, CavemanSpot.id)[0] is None
+
+    def where(cursor, descending):
+        stmt = pagination.keyset(select(CavemanSpot), CavemanSpot.date, CavemanSpot.id, page(cursor=cursor), descending)
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        return sql[sql.index("WHERE"):sql.index("ORDER BY")]
+
+    # NULLs sort first when descending: finish the NULL run, then every dated row
+    assert where(cursor, True) == "WHERE spots.date IS NULL AND spots.id < %(id_1)s::UUID OR spots.date IS NOT NULL "
+    # ...and last when ascending: past a dated cursor the NULL rows are still ahead
+    dated = pagination.encode_cursor(date(2025, 1, 2), row_id)
+    assert "OR spots.date IS NULL" in where(dated, False)
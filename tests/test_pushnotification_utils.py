@@ -1,38 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
 import pytest
-from pywebpush import WebPushException
 
 from app.utils import pushnotification
 from app.config import settings
 
 
-class DummyResponse:
-    def __init__(self, status_code):
-        self.status_code = status_code
-
-
-def setup_settings(monkeypatch):
+def setup_client(monkeypatch, handler):
     monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", "key")
     monkeypatch.setattr(settings, "VAPID_CLAIMS_EMAIL", "test@example.com")
+    monkeypatch.setattr(pushnotification, "_encrypt", lambda sub, payload: (b"data", {}))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(pushnotification, "_client", client)
 
 
-def test_send_push_success(monkeypatch):
-    setup_settings(monkeypatch)
+class FakeSession:
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.executed.append(stmt)
+
+    async def commit(self):
+        self.commits += 1
+
 
-    def fake_webpush(**kwargs):
-        return "ok"
+def test_send_push_success(monkeypatch):
+    setup_client(monkeypatch, lambda request: httpx.Response(201))
 
-    monkeypatch.setattr(pushnotification, "webpush", lambda **kwargs: fake_webpush(**kwargs))
-    result = pushnotification.send_push({"endpoint": "e", "keys": {}}, "data")
-    assert result == "ok"
+    result = asyncio.run(pushnotification.send_push({"endpoint": "https://push.test/e", "keys": {}}, "data"))
+    assert result.ok
+    assert result.status_code == 201
 
 
 @pytest.mark.parametrize("status", [410, 404, 400, 401, 500])
 def test_send_push_failures(monkeypatch, status):
-    setup_settings(monkeypatch)
+    setup_client(monkeypatch, lambda request: httpx.Response(status))
+
+    db = FakeSession()
+    result = asyncio.run(
+        pushnotification.send_push({"endpoint": "https://push.test/e", "keys": {}}, "data", db=db, sub_id="s1")
+    )
+    assert not result.ok
+    assert result.expired == (status in (404, 410))
+    assert db.commits == (1 if status in (404, 410) else 0)
+
+
+def test_send_push_network_error(monkeypatch):
+    def handler(request):
+        raise httpx.ConnectError("down")
+
+    setup_client(monkeypatch, handler)
+
+    result = asyncio.run(pushnotification.send_push({"endpoint": "https://push.test/e", "keys": {}}, "data"))
+    assert not result.ok
+    assert result.status_code is None
+
+
+def test_send_push_batch_bounded_concurrency(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(410 if request.url.path == "/gone" else 201)
+
+    setup_client(monkeypatch, handler)
+
+    subs = [SimpleNamespace(id=i, endpoint=f"https://push.test/{i}", keys={}) for i in range(10)]
+    subs.append(SimpleNamespace(id="old", endpoint="https://push.test/gone", keys={}))
+    db = FakeSession()
+
+    results = asyncio.run(pushnotification.send_push_batch(subs, "data", db=db, concurrency=3))
+
+    assert [r.sub_id for r in results] == [s.id for s in subs]
+    assert sum(r.ok for r in results) == 10
+    assert peak <= 3
+    assert len(db.executed) == 1
+    assert db.commits == 1
+
+
+def test_vapid_headers_cached_per_origin(monkeypatch):
+    signed = []
+
+    class FakeVapid:
+        def sign(self, claims):
+            signed.append(claims)
+            return {"Authorization": f"vapid {len(signed)}"}
+
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", "key")
+    monkeypatch.setattr(pushnotification, "_vapid", ("key", FakeVapid()))
+    monkeypatch.setattr(pushnotification, "_vapid_headers_cache", {})
+
+    now = 1_000_000
+    monkeypatch.setattr(pushnotification.time, "time", lambda: now)
+
+    a = pushnotification._vapid_headers("https://fcm.googleapis.com/fcm/send/a")
+    b = pushnotification._vapid_headers("https://fcm.googleapis.com/fcm/send/b")
+    c = pushnotification._vapid_headers("https://updates.push.services.mozilla.com/wpush/v2/c")
 
-    def fake_webpush(**kwargs):
-        raise WebPushException("error", response=DummyResponse(status))
+    assert a == b
+    assert a != c
+    assert [claims["aud"] for claims in signed] == [
+        "https://fcm.googleapis.com",
+        "https://updates.push.services.mozilla.com",
+    ]
 
-    monkeypatch.setattr(pushnotification, "webpush", lambda **kwargs: fake_webpush(**kwargs))
-    result = pushnotification.send_push({"endpoint": "e", "keys": {}}, "data")
-    assert result is None
+    # Re-signed once the cached token is close to its exp claim
+    now += pushnotification.VAPID_EXPIRY_SECONDS - pushnotification.VAPID_REFRESH_MARGIN_SECONDS
+    pushnotification._vapid_headers("https://fcm.googleapis.com/fcm/send/a")
+    assert len(signed) == 3
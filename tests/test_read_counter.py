@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.utils import read_counter
+
+
+class FakeSession:
+    def __init__(self, log, fail=False):
+        self.log = log
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def execute(self, stmt, params):
+        if self.fail:
+            raise ConnectionError("db down")
+        self.log.append(params)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(monkeypatch):
+    monkeypatch.setattr(read_counter, "_pending", {})
+
+
+def test_reads_are_batched_per_article(monkeypatch):
+    log = []
+    monkeypatch.setattr(read_counter, "AsyncSessionLocal", lambda: FakeSession(log))
+
+    async def scenario():
+        for _ in range(3):
+            read_counter.record_read("a")
+        read_counter.record_read("b")
+        return await read_counter.flush()
+
+    assert asyncio.run(scenario()) == 2
+    # one executemany for the article counters, one for the per-day totals
+    assert len(log) == 2
+    assert {p["b_slug"]: p["b_reads"] for p in log[0]} == {"a": 3, "b": 1}
+    assert {p["b_slug"]: p["b_reads"] for p in log[1]} == {"a": 3, "b": 1}
+    assert read_counter._pending == {}
+
+
+def test_failed_flush_keeps_reads_for_retry(monkeypatch):
+    monkeypatch.setattr(read_counter, "AsyncSessionLocal", lambda: FakeSession([], fail=True))
+
+    async def scenario():
+        read_counter.record_read("a")
+        await read_counter.flush()
+        read_counter.record_read("a")
+
+    asyncio.run(scenario())
+    assert read_counter._pending == {"a": 2}
+
+
+def test_burst_schedules_one_early_flush(monkeypatch):
+    flushes = []
+
+    async def fake_flush():
+        flushes.append(1)
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(read_counter, "flush", fake_flush)
+    monkeypatch.setattr(read_counter, "_early_flush", None)
+    monkeypatch.setattr(read_counter.settings, "READ_BUFFER_MAX_SLUGS", 1)
+
+    async def scenario():
+        for slug in "abcde":
+            read_counter.record_read(slug)
+        await read_counter._early_flush
+
+    asyncio.run(scenario())
+    assert flushes == [1]
@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+from app.utils import reflection_batch
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    """Serves user ids after the cursor, two per page."""
+
+    def __init__(self, user_ids, cursor=None):
+        self.user_ids = user_ids
+        self.cursor = cursor
+        self.saved = []
+
+    async def get(self, model, name):
+        return SimpleNamespace(position=self.cursor) if self.cursor else None
+
+    async def execute(self, stmt):
+        after = stmt.compile().params.get("id_1")
+        rows = [u for u in self.user_ids if after is None or u > after]
+        return FakeResult(rows[:2])
+
+
+def run_batch(monkeypatch, ids, fail):
+    """Run last week's batch, resuming after ids[0]; `fail(user_id)` decides each attempt."""
+    generated = []
+
+    async def fake_generate(user_id, week_start, week_end):
+        if fail(user_id):
+            raise RuntimeError("model down")
+        generated.append(user_id)
+        return "text", False
+
+    async def fake_save_cursor(db, week_start, position):
+        db.saved.append(position)
+
+    monkeypatch.setattr(reflection_batch, "generate_reflection", fake_generate)
+    monkeypatch.setattr(reflection_batch, "save_cursor", fake_save_cursor)
+    monkeypatch.setattr(reflection_batch.settings, "REFLECTION_BATCH_SIZE", 2)
+
+    # Week of 2025-01-06 already processed up to the first user
+    db = FakeDB(ids, cursor=f"2025-01-06:{ids[0]}")
+    totals = asyncio.run(reflection_batch.pregenerate_weekly_reflections(db, today=date(2025, 1, 13)))
+    return totals, generated, db.saved
+
+
+def test_batch_isolates_failures_and_keeps_the_cursor_before_them(monkeypatch):
+    ids = sorted(uuid.UUID(int=i) for i in range(1, 6))
+
+    totals, generated, saved = run_batch(monkeypatch, ids, fail=lambda user_id: user_id == ids[2])
+
+    assert totals == {"generated": 3, "failed": 1}
+    assert generated == [ids[1], ids[3], ids[4]]
+    # never moves past the failed user, and the week is not marked done
+    assert saved == [str(ids[1]), str(ids[1])]
+
+
+def test_failed_users_are_retried_before_the_week_is_done(monkeypatch):
+    ids = sorted(uuid.UUID(int=i) for i in range(1, 6))
+    attempts = []
+
+    def fail_once(user_id):
+        attempts.append(user_id)
+        return user_id == ids[2] and attempts.count(user_id) == 1
+
+    totals, generated, saved = run_batch(monkeypatch, ids, fail=fail_once)
+
+    assert totals == {"generated": 4}
+    assert generated == [ids[1], ids[3], ids[4], ids[2]]
+    assert saved == [str(ids[1]), str(ids[1]), "done"]
+
+
+def test_finished_week_is_not_rerun():
+    db = FakeDB([], cursor="2025-01-06:done")
+    assert asyncio.run(reflection_batch.pregenerate_weekly_reflections(db, today=date(2025, 1, 13))) == {}
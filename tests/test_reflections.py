@@ -0,0 +1,185 @@
+import asyncio
+import json
+from datetime import date
+from types import SimpleNamespace
+
+from app.Routes import reflections_routes
+from app.helper import reflections
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, texts):
+        self.texts = texts
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for t in self.texts:
+            yield chunk(t)
+
+
+class FakeCompletions:
+    async def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        return FakeStream(["You ", None, "showed up."])
+
+
+class FakeSession:
+    def __init__(self, saved):
+        self.saved = saved
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def add(self, obj):
+        self.saved.append(obj)
+
+    async def commit(self):
+        pass
+
+
+def parse(events):
+    out = []
+    for raw in events:
+        event, data = raw.strip().split("\n")
+        out.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return out
+
+
+def test_stream_yields_tokens_then_saves(monkeypatch):
+    saved = []
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    monkeypatch.setattr(reflections_routes, "get_openai_client", lambda: client)
+    monkeypatch.setattr(reflections_routes, "AsyncSessionLocal", lambda: FakeSession(saved))
+
+    async def collect():
+        gen = reflections_routes.stream_reflection("prompt", "u1", date(2025, 1, 6), date(2025, 1, 12))
+        return [e async for e in gen]
+
+    events = parse(asyncio.run(collect()))
+    assert events == [
+        ("token", {"text": "You "}),
+        ("token", {"text": "showed up."}),
+        ("done", {"reflection": "You showed up.", "cached": False}),
+    ]
+    assert saved[0].content == "You showed up."
+    assert saved[0].week_start == date(2025, 1, 6)
+
+
+def test_input_hash_tracks_prompt_inputs():
+    base = reflections.reflection_input_hash("Identity: runner\n- 2025-01-06: ✅")
+    assert base == reflections.reflection_input_hash("Identity: runner\n- 2025-01-06: ✅")
+    assert base != reflections.reflection_input_hash("Identity: runner\n- 2025-01-06: ❌")
+    assert len(base) == 64
+
+
+def Row(kind, day=None, completed=None, text=None, note=None):
+    return SimpleNamespace(kind=kind, day=day, completed=completed, text=text, note=note)
+
+
+def test_context_is_loaded_in_one_query_and_rendered_in_order():
+    class FakeDB:
+        def __init__(self):
+            self.queries = 0
+
+        async def execute(self, stmt):
+            self.queries += 1
+            return SimpleNamespace(all=lambda: [
+                Row("spot", date(2025, 1, 8), text="Doomscrolled"),
+                Row("tracker", date(2025, 1, 7), True, note="easy"),
+                Row("worksheet", text="a runner", note="shoes by the door"),
+                Row("tracker", date(2025, 1, 6), False),
+                Row("log", date(2025, 1, 6), text="Cold shower", note=None),
+            ])
+
+    db = FakeDB()
+    prompt = asyncio.run(reflections.build_reflection_prompt(db, "u1", date(2025, 1, 6), date(2025, 1, 12)))
+
+    assert db.queries == 1
+    assert "Identity: a runner" in prompt
+    assert prompt.index("2025-01-06: ❌") < prompt.index("2025-01-07: ✅ easy")
+    assert "- Challenge: Cold shower, Note: no note" in prompt
+    assert "- Doomscrolled" in prompt
+
+
+def test_no_worksheet_means_no_prompt():
+    class EmptyDB:
+        async def execute(self, stmt):
+            return SimpleNamespace(all=lambda: [])
+
+    assert asyncio.run(reflections.load_reflection_context(EmptyDB(), "u1", date(2025, 1, 6), date(2025, 1, 12))) is None
+
+
+def test_no_session_is_held_across_the_model_call(monkeypatch):
+    open_sessions = []
+    saved = []
+
+    class Session:
+        async def __aenter__(self):
+            open_sessions.append(self)
+            return self
+
+        async def __aexit__(self, *exc):
+            open_sessions.remove(self)
+
+    async def fake_prompt(db, user_id, week_start, week_end):
+        return "prompt"
+
+    async def no_memo(db, user_id, week_start, input_hash):
+        return None
+
+    async def fake_complete(prompt):
+        assert open_sessions == []
+        return "You showed up."
+
+    async def fake_save(db, user_id, week_start, week_end, content, input_hash):
+        assert open_sessions == [db]
+        saved.append(content)
+
+    monkeypatch.setattr(reflections, "AsyncSessionLocal", Session)
+    monkeypatch.setattr(reflections, "build_reflection_prompt", fake_prompt)
+    monkeypatch.setattr(reflections, "find_memoised_reflection", no_memo)
+    monkeypatch.setattr(reflections, "complete_reflection", fake_complete)
+    monkeypatch.setattr(reflections, "save_reflection", fake_save)
+
+    result = asyncio.run(reflections.generate_reflection("u1", date(2025, 1, 6), date(2025, 1, 12)))
+    assert result == ("You showed up.", False)
+    assert saved == ["You showed up."]
+
+
+def test_streaming_request_releases_its_session_before_streaming(monkeypatch):
+    calls = []
+
+    class RequestSession:
+        async def commit(self):
+            calls.append("commit")
+
+    async def fake_prompt(db, user_id, week_start, week_end):
+        calls.append("prompt")
+        return "prompt"
+
+    async def no_memo(db, user_id, week_start, input_hash):
+        return None
+
+    def fake_stream(*args):
+        calls.append("stream")
+        return iter(())
+
+    monkeypatch.setattr(reflections_routes, "build_reflection_prompt", fake_prompt)
+    monkeypatch.setattr(reflections_routes, "find_memoised_reflection", no_memo)
+    monkeypatch.setattr(reflections_routes, "stream_reflection", fake_stream)
+
+    user = SimpleNamespace(id="u1")
+    response = asyncio.run(
+        reflections_routes.generate_weekly_reflection(stream=True, force=False, current_user=user, db=RequestSession())
+    )
+    assert response.media_type == "text/event-stream"
+    assert calls == ["prompt", "commit", "stream"]
@@ -36,3 +36,68 @@ def test_has_logged_micro_today(monkeypatch):
 
     db_false = FakeSession(None)
     assert asyncio.run(reminder_engine.has_logged_micro_today("u1", db_false)) is False
+
+
+class FakeRowsSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    async def execute(self, stmt):
+        self.calls += 1
+        rows = self.rows
+
+        class Result:
+            def all(self):
+                return rows
+
+        return Result()
+
+
+def test_load_reminder_audience_groups_devices(monkeypatch):
+    from types import SimpleNamespace
+
+    u1 = SimpleNamespace(id="u1")
+    u2 = SimpleNamespace(id="u2")
+    rows = [
+        (u1, SimpleNamespace(endpoint="a"), True),
+        (u1, SimpleNamespace(endpoint="b"), True),
+        (u2, SimpleNamespace(endpoint="c"), False),
+    ]
+    db = FakeRowsSession(rows)
+
+    recipients = asyncio.run(reminder_engine.load_reminder_audience(db, reminder_engine.spotted_today_clause))
+
+    assert db.calls == 1
+    assert [r.user.id for r in recipients] == ["u1", "u2"]
+    assert [s.endpoint for s in recipients[0].subscriptions] == ["a", "b"]
+    assert recipients[0].done_today is True
+    assert recipients[1].done_today is False
+
+
+def test_load_reminder_audience_local_slot(monkeypatch):
+    from datetime import date, time
+    from types import SimpleNamespace
+    from sqlalchemy.dialects import postgresql
+
+    local_day = date(2025, 1, 31)
+    rows = [(SimpleNamespace(id="u1"), SimpleNamespace(endpoint="a"), False, local_day)]
+    db = FakeRowsSession(rows)
+    statements = []
+    original_execute = db.execute
+
+    async def capture(stmt):
+        statements.append(stmt)
+        return await original_execute(stmt)
+
+    db.execute = capture
+
+    recipients = asyncio.run(
+        reminder_engine.load_reminder_audience(db, reminder_engine.logged_micro_today_clause, slot=time(13, 0))
+    )
+
+    assert recipients[0].local_date == local_day
+    assert reminder_engine._job_run("microchallenge_push", local_day) == "microchallenge_push:2025-01-31"
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "timezone(coalesce(user_preferences.timezone" in sql
+    assert "LEFT OUTER JOIN user_preferences" in sql
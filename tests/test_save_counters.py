@@ -0,0 +1,27 @@
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from app.utils import save_counters
+
+
+def compile_pg(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_save_inserts_and_counts_in_one_statement():
+    sql = compile_pg(save_counters.save_stmt(uuid.uuid4(), "slug"))
+
+    assert sql.startswith("WITH article AS")
+    assert "ON CONFLICT ON CONSTRAINT uq_user_article DO NOTHING" in sql
+    assert "save_count=(articles.save_count +" in sql
+    assert "FROM new_save WHERE articles.id = new_save.article_id" in sql
+    assert "FROM article LEFT OUTER JOIN bumped ON true" in sql
+
+
+def test_unsave_deletes_and_decrements_without_going_negative():
+    sql = compile_pg(save_counters.unsave_stmt(uuid.uuid4(), "slug"))
+
+    assert "DELETE FROM saved_articles USING article" in sql
+    assert "save_count=greatest(articles.save_count -" in sql
+    assert "FROM removed WHERE articles.id = removed.article_id" in sql
@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+
+from app.helper import saved_articles
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeDB:
+    def __init__(self, slugs, articles=("a", "b", "c")):
+        self.slugs = slugs
+        self.articles = articles
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        if "EXISTS" in str(stmt):  # single-article check
+            slug = stmt.compile().params["slug_1"]
+            if slug not in self.articles:
+                return FakeResult([])
+            return FakeResult([slug in self.slugs])
+        return FakeResult(list(self.slugs))
+
+
+def test_saved_slugs_are_cached_until_invalidated():
+    user_id = uuid.uuid4()
+    db = FakeDB(["a", "b"])
+
+    async def scenario():
+        first = await saved_articles.get_saved_slugs(db, user_id)
+        again = await saved_articles.get_saved_slugs(db, user_id)
+        saved_articles.invalidate_saved(user_id)
+        db.slugs = ["a"]
+        after = await saved_articles.get_saved_slugs(db, user_id)
+        return first, again, after
+
+    first, again, after = asyncio.run(scenario())
+    assert first == again == {"a", "b"}
+    assert after == {"a"}
+    assert db.queries == 2
+
+
+def test_single_check_sees_a_save_made_elsewhere():
+    user_id = uuid.uuid4()
+    db = FakeDB(["a"])
+
+    async def scenario():
+        cached = await saved_articles.get_saved_slugs(db, user_id)
+        db.slugs = ["a", "c"]  # saved through another worker; this worker's cache is not invalidated
+        return (
+            cached,
+            await saved_articles.is_saved(db, user_id, "c"),
+            await saved_articles.is_saved(db, user_id, "b"),
+            await saved_articles.is_saved(db, user_id, "missing"),
+        )
+
+    cached, saved, not_saved, unknown = asyncio.run(scenario())
+    assert "c" not in cached
+    assert saved is True
+    assert not_saved is False
+    assert unknown is None
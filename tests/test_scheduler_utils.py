@@ -71,5 +71,63 @@ def test_start_scheduler(monkeypatch):
     scheduler.start_scheduler()
 
     add_calls = [c for c in calls if c[0] == "add"]
-    assert len(add_calls) == 3
+    assert len(add_calls) == 7
+    assert add_calls[0][2]["id"] == "leader_election"
+    assert "cache_stats" in [c[2]["id"] for c in add_calls]
+    assert add_calls[-1][2]["id"] == "reflection_job"
     assert ("start",) in calls
+
+
+def test_cron_jobs_skip_when_not_leader(monkeypatch):
+    calls = []
+
+    async def fake_run_safe(task, name):
+        calls.append(name)
+
+    monkeypatch.setattr(scheduler, "run_safe", fake_run_safe)
+
+    leading = False
+
+    async def fake_ensure_leadership():
+        return leading
+
+    monkeypatch.setattr(scheduler.leader, "ensure_leadership", fake_ensure_leadership)
+    asyncio.run(scheduler.run_spot_job())
+    asyncio.run(scheduler.run_outbox_job())
+    assert calls == ["outbox_drain"]
+
+    # e.g. the old leader died just before the cron fired: the lock is taken on the spot
+    leading = True
+    asyncio.run(scheduler.run_spot_job())
+    assert calls == ["outbox_drain", "spot_push"]
+
+
+def test_start_scheduler_local_mode(monkeypatch):
+    triggers = {}
+
+    class DummyScheduler:
+        def add_job(self, func, trigger, **kwargs):
+            triggers[kwargs["id"]] = trigger
+
+        def start(self):
+            pass
+
+    monkeypatch.setattr(scheduler, "scheduler", DummyScheduler())
+    monkeypatch.setattr(scheduler, "CronTrigger", lambda **kwargs: ("cron", kwargs))
+    monkeypatch.setattr(scheduler.settings, "SCHEDULER_MODE", "local")
+
+    scheduler.start_scheduler()
+
+    assert triggers["spot_job"] == ("cron", {"minute": "*/5", "timezone": scheduler.india_tz})
+    assert triggers["behavioral_job"] == triggers["challenge_job"] == triggers["spot_job"]
+
+
+def test_cache_stats_are_logged_per_cache(monkeypatch, caplog):
+    monkeypatch.setattr(scheduler, "auth_cache_stats", lambda: {
+        "tokens": {"size": 1, "maxsize": 10, "hits": 3, "misses": 1},
+        "users": {"size": 0, "maxsize": 10, "hits": 0, "misses": 0},
+    })
+    with caplog.at_level("INFO", logger="apscheduler"):
+        scheduler.log_cache_stats()
+    assert "Auth tokens cache" in caplog.text and "hit rate 75%" in caplog.text
+    assert "Auth users cache" in caplog.text and "hit rate n/a" in caplog.text
@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+
+from app.utils import whatsapp
+
+
+def setup_client(monkeypatch, handler):
+    client = httpx.AsyncClient(base_url="https://twilio.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(whatsapp, "_client", client)
+
+
+def test_send_whatsapp_message_success(monkeypatch):
+    def handler(request):
+        assert request.url.path == "/Messages.json"
+        assert b"To=whatsapp%3A%2B15550001" in request.content
+        return httpx.Response(201, json={"sid": "SM1"})
+
+    setup_client(monkeypatch, handler)
+
+    result = asyncio.run(whatsapp.send_whatsapp_message("+15550001", "hi"))
+    assert result.ok
+    assert result.sid == "SM1"
+
+
+def test_send_whatsapp_message_failure(monkeypatch):
+    setup_client(monkeypatch, lambda request: httpx.Response(400, text="bad number"))
+
+    result = asyncio.run(whatsapp.send_whatsapp_message("+1", "hi"))
+    assert not result.ok
+    assert result.status_code == 400
+    assert result.error == "bad number"
+
+
+def test_send_many_bounded_concurrency(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(201, json={"sid": "SM"})
+
+    setup_client(monkeypatch, handler)
+
+    messages = [(f"+1555{i}", "hi") for i in range(8)]
+    results = asyncio.run(whatsapp.send_many(messages, concurrency=2))
+
+    assert [r.to for r in results] == [to for to, _ in messages]
+    assert all(r.ok for r in results)
+    assert peak <= 2